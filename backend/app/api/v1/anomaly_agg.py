@@ -0,0 +1,95 @@
+"""Vectorized anomaly aggregation over integer-coded anomaly fields."""
+from typing import Dict, Any, List, Iterable, Optional
+import numpy as np
+
+DIMENSIONS = {
+    "severity": "medium",
+    "anomaly_type": "other",
+    "detected_by": "unknown",
+}
+
+# Codes are shared by every pipeline in the process. Severity is a closed set; the other fields
+# admit new values (the LLM names its own anomaly types) until the table is full, after which
+# unknown values fall into the field's default bucket.
+MAX_CODES = {
+    "severity": 4,
+    "anomaly_type": 64,
+    "detected_by": 16,
+}
+
+_code_tables: Dict[str, Dict[str, int]] = {
+    "severity": {"critical": 0, "high": 1, "medium": 2, "low": 3},
+    "anomaly_type": {"other": 0},
+    "detected_by": {"unknown": 0},
+}
+
+
+def _code(table: Dict[str, int], field: str, value: Any) -> int:
+    if not isinstance(value, str):
+        value = DIMENSIONS[field]
+    code = table.get(value)
+    if code is None:
+        if len(table) >= MAX_CODES[field]:
+            return table[DIMENSIONS[field]]
+        code = table[value] = len(table)
+    return code
+
+
+def _encode(anomalies: List[Dict[str, Any]], field: str) -> np.ndarray:
+    table = _code_tables[field]
+    return np.fromiter(
+        (_code(table, field, a.get(field)) for a in anomalies),
+        dtype=np.int16,
+        count=len(anomalies)
+    )
+
+
+def encode_anomalies(anomalies: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    return {field: _encode(anomalies, field) for field in DIMENSIONS}
+
+
+def count_by(codes: np.ndarray, max_code: int) -> np.ndarray:
+    return np.bincount(codes, minlength=max_code)
+
+
+def count_anomalies(codes: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {
+        field: count_by(field_codes, len(_code_tables[field]))
+        for field, field_codes in codes.items()
+    }
+
+
+def group_indices(codes: np.ndarray, field: str) -> Dict[str, List[int]]:
+    # Only codes this pipeline uses get a group; severity always lists all of its levels.
+    table = _code_tables[field]
+    size = len(table) if field == "severity" else (int(codes.max()) + 1 if len(codes) else 0)
+    names = list(table)[:size]
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(count_by(codes, size))[:-1]
+
+    return {
+        names[code]: group.tolist()
+        for code, group in enumerate(np.split(order, bounds))
+        if len(group) or field == "severity"
+    }
+
+
+def summarize_counts(per_pipeline: Iterable[Optional[Dict[str, np.ndarray]]]) -> Dict[str, Any]:
+    totals = {field: np.zeros(len(table), dtype=np.int64) for field, table in _code_tables.items()}
+
+    for counts in per_pipeline:
+        if not counts:
+            continue
+        for field, field_counts in counts.items():
+            totals[field][:len(field_counts)] += field_counts
+
+    summary = {"total": int(totals["severity"].sum())}
+    for field, table in _code_tables.items():
+        field_totals = totals[field]
+        summary[field] = {
+            name: int(field_totals[code])
+            for name, code in table.items()
+            if field_totals[code] or (field == "severity" and code < 4)
+        }
+
+    return summary
@@ -1,6 +1,6 @@
 """Dataset management API endpoints."""
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
 from app.api.v1.ingestion import active_pipelines
@@ -14,7 +14,7 @@ router = APIRouter()
 async def list_datasets() -> Dict[str, Any]:
     datasets = []
 
-    for pipeline_id, pipeline_data in active_pipelines.items():
+    for pipeline_id, pipeline_data in await active_pipelines.items():
         result = pipeline_data.get("result", {})
         overall_metrics = result.get("overall_metrics", {})
 
@@ -36,30 +36,34 @@ async def list_datasets() -> Dict[str, Any]:
 
 
 @router.get("/{pipeline_id}")
-async def get_dataset(pipeline_id: str) -> Dict[str, Any]:
-    if pipeline_id not in active_pipelines:
+async def get_dataset(pipeline_id: str, include: Optional[str] = None) -> Dict[str, Any]:
+    pipeline_data = await active_pipelines.get(pipeline_id)
+    if pipeline_data is None:
         raise HTTPException(status_code=404, detail=f"Dataset {pipeline_id} not found")
 
-    pipeline_data = active_pipelines[pipeline_id]
     result = pipeline_data.get("result", {})
+    fields = set(include.split(",")) if include else set()
 
-    return {
+    response = {
         "pipeline_id": pipeline_id,
         "file_name": pipeline_data.get("file_name"),
         "source_type": pipeline_data.get("source_type"),
         "status": pipeline_data.get("status"),
         "overall_metrics": result.get("overall_metrics", {}),
-        "stages": result.get("stages", {}),
         "errors": result.get("errors", [])
     }
+    if "stages" in fields:
+        response["stages"] = result.get("stages", {})
+
+    return response
 
 
 @router.get("/{pipeline_id}/download")
 async def download_cleaned_dataset(pipeline_id: str) -> Dict[str, Any]:
-    if pipeline_id not in active_pipelines:
+    pipeline_data = await active_pipelines.get(pipeline_id)
+    if pipeline_data is None:
         raise HTTPException(status_code=404, detail=f"Dataset {pipeline_id} not found")
 
-    pipeline_data = active_pipelines[pipeline_id]
 
     if pipeline_data.get("status") != "completed":
         raise HTTPException(status_code=400, detail="Dataset processing not completed")
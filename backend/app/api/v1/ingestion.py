@@ -1,10 +1,21 @@
 """Data ingestion API endpoints."""
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from typing import Optional
+from cachetools import TTLCache
+from collections import defaultdict
+from typing import Optional, Dict, Any, List, Tuple
+import aiofiles
+import aiofiles.os
+import asyncio
 import logging
+import numpy as np
+import orjson
 import os
+import pandas as pd
+import time
 import uuid
+import zlib
 
+from app.api.v1.anomaly_agg import count_anomalies, encode_anomalies, group_indices
 from app.config import settings
 from app.watsonx.pipeline import DataPipeline
 
@@ -12,7 +23,366 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-active_pipelines = {}
+UPLOAD_CHUNK_SIZE = 1 << 20
+CSV_EXTENSIONS = (".csv", ".csv.gz")
+CSV_CONTENT_TYPES = (
+    "text/csv",
+    "application/vnd.ms-excel",
+    "application/octet-stream",
+    "application/gzip",
+    "application/x-gzip"
+)
+
+
+class PipelineMetricColumns:
+    """Structure-of-arrays copy of per-pipeline counters so totals are vectorized sums."""
+
+    FIELDS = (
+        "total_rows_ingested",
+        "anomalies_detected",
+        "cleaned_rows",
+        "completed",
+        "failed",
+        "running"
+    )
+
+    def __init__(self, capacity: int):
+        self.columns = {field: np.zeros(capacity, dtype=np.int64) for field in self.FIELDS}
+        self.ordinals: Dict[str, int] = {}
+        self.free_slots: List[int] = []
+        self.size = 0
+
+    def set(self, pipeline_id: str, pipeline_data: Dict[str, Any]):
+        slot = self.ordinals.get(pipeline_id)
+        if slot is None:
+            slot = self.free_slots.pop() if self.free_slots else self._next_slot()
+            self.ordinals[pipeline_id] = slot
+
+        overall_metrics = pipeline_data.get("result", {}).get("overall_metrics", {})
+        status = pipeline_data.get("status")
+        columns = self.columns
+        columns["total_rows_ingested"][slot] = overall_metrics.get("total_rows_ingested", 0)
+        columns["anomalies_detected"][slot] = overall_metrics.get("anomalies_detected", 0)
+        columns["cleaned_rows"][slot] = overall_metrics.get("cleaned_rows", 0)
+        columns["completed"][slot] = bool(pipeline_data.get("completed"))
+        columns["failed"][slot] = status == "failed"
+        columns["running"][slot] = status == "running"
+
+    def discard(self, pipeline_id: str):
+        slot = self.ordinals.pop(pipeline_id, None)
+        if slot is None:
+            return
+        for column in self.columns.values():
+            column[slot] = 0
+        self.free_slots.append(slot)
+
+    def totals(self) -> Dict[str, int]:
+        return {field: int(column[:self.size].sum()) for field, column in self.columns.items()}
+
+    def _next_slot(self) -> int:
+        if self.size == len(self.columns["completed"]):
+            for field, column in self.columns.items():
+                self.columns[field] = np.concatenate([column, np.zeros_like(column)])
+        self.size += 1
+        return self.size - 1
+
+
+class PipelineCache(TTLCache):
+    """TTL/LRU-bounded pipeline store that invalidates anomaly views on eviction."""
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.metric_columns = PipelineMetricColumns(maxsize)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.metric_columns.set(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.metric_columns.discard(key)
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        if expired:
+            for key, _ in expired:
+                self.metric_columns.discard(key)
+            _invalidate_anomaly_views()
+        return expired
+
+    def popitem(self):
+        item = super().popitem()
+        _invalidate_anomaly_views()
+        return item
+
+
+class LocalPipelineStore:
+    """In-process pipeline store exposing the same async interface as RedisPipelineStore."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.cache = PipelineCache(maxsize=maxsize, ttl=ttl)
+
+    @property
+    def metric_columns(self) -> PipelineMetricColumns:
+        return self.cache.metric_columns
+
+    async def get(self, pipeline_id: str, default=None):
+        return self.cache.get(pipeline_id, default)
+
+    async def set(self, pipeline_id: str, pipeline_data: Dict[str, Any]):
+        self.cache[pipeline_id] = pipeline_data
+
+    async def delete(self, pipeline_id: str):
+        del self.cache[pipeline_id]
+
+    async def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        return list(self.cache.items())
+
+    async def count(self) -> int:
+        return len(self.cache)
+
+    async def expire(self):
+        self.cache.expire()
+
+
+DERIVED_PIPELINE_FIELDS = ("anomalies", "anomaly_index", "anomaly_counts", "tagged_anomalies")
+
+
+def _json_default(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if value is pd.NaT or value is pd.NA:
+        return None
+    raise TypeError(f"Cannot store {type(value).__name__} in the pipeline store")
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def _without_published_frame(result: Dict[str, Any]) -> Dict[str, Any]:
+    # The published DataFrame stays with the worker that ran the pipeline; only the JSON result is shared.
+    stages = result.get("stages", {})
+    publishing = stages.get("publishing", {})
+    if "dataframe" not in publishing:
+        return result
+    publishing = {key: value for key, value in publishing.items() if key != "dataframe"}
+    return {**result, "stages": {**stages, "publishing": publishing}}
+
+
+class RedisPipelineStore:
+    """Pipeline store shared across workers: one Redis hash per pipeline, result as a compressed blob."""
+
+    KEY_PREFIX = "pipeline:"
+    INDEX_KEY = "pipelines:index"
+    VERSION_KEY = "pipelines:version"
+
+    def __init__(self, url: str, maxsize: int, ttl: int):
+        import redis.asyncio as redis
+
+        self.client = redis.Redis.from_url(url)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.metric_columns = PipelineMetricColumns(1)
+        self._decoded = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._seen_version = None
+
+    def _key(self, pipeline_id: str) -> str:
+        return f"{self.KEY_PREFIX}{pipeline_id}"
+
+    async def _ids(self) -> List[str]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(self.INDEX_KEY, "-inf", time.time() - self.ttl)
+            pipe.zrange(self.INDEX_KEY, 0, -1)
+            _, pipeline_ids = await pipe.execute()
+        return [pipeline_id.decode() for pipeline_id in pipeline_ids]
+
+    async def _trim(self):
+        # The index is scored by write time, so the oldest pipelines are evicted first.
+        size = await self.client.zcard(self.INDEX_KEY)
+        if size <= self.maxsize:
+            return
+        evicted = await self.client.zpopmin(self.INDEX_KEY, size - self.maxsize)
+        if evicted:
+            await self.client.delete(*(self._key(pipeline_id.decode()) for pipeline_id, _ in evicted))
+
+    def _encode(self, pipeline_data: Dict[str, Any], revision: int) -> Dict[str, bytes]:
+        fields = {
+            field: _dumps(value)
+            for field, value in pipeline_data.items()
+            if field not in DERIVED_PIPELINE_FIELDS and field != "result"
+        }
+        fields["revision"] = str(revision).encode()
+        if "result" in pipeline_data:
+            result = _without_published_frame(pipeline_data["result"])
+            fields["result"] = zlib.compress(_dumps(result))
+            fields["overall_metrics"] = _dumps(result.get("overall_metrics", {}))
+        return fields
+
+    def _decode(self, pipeline_id: str, fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+        pipeline_data = {}
+        for field, value in fields.items():
+            field = field.decode()
+            if field in ("overall_metrics", "revision"):
+                continue
+            if field == "result":
+                value = zlib.decompress(value)
+            pipeline_data[field] = orjson.loads(value)
+        if "result" in pipeline_data:
+            pipeline_data.update(_anomaly_views(pipeline_data["result"], pipeline_id))
+        return pipeline_data
+
+    async def get(self, pipeline_id: str, default=None):
+        key = self._key(pipeline_id)
+        revision = await self.client.hget(key, "revision")
+        if revision is None:
+            self._decoded.pop(pipeline_id, None)
+            return default
+
+        cached = self._decoded.get(pipeline_id)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+
+        fields = await self.client.hgetall(key)
+        if not fields:
+            return default
+        pipeline_data = self._decode(pipeline_id, fields)
+        self._decoded[pipeline_id] = (fields[b"revision"], pipeline_data)
+        return pipeline_data
+
+    async def set(self, pipeline_id: str, pipeline_data: Dict[str, Any]):
+        key = self._key(pipeline_id)
+        revision = await self.client.incr(self.VERSION_KEY)
+        async with self.client.pipeline() as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=self._encode(pipeline_data, revision))
+            pipe.expire(key, self.ttl)
+            pipe.zadd(self.INDEX_KEY, {pipeline_id: time.time()})
+            await pipe.execute()
+        await self._trim()
+
+    async def delete(self, pipeline_id: str):
+        async with self.client.pipeline() as pipe:
+            pipe.delete(self._key(pipeline_id))
+            pipe.zrem(self.INDEX_KEY, pipeline_id)
+            pipe.incr(self.VERSION_KEY)
+            deleted, _, _ = await pipe.execute()
+        self._decoded.pop(pipeline_id, None)
+        if not deleted:
+            raise KeyError(pipeline_id)
+
+    async def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        pipeline_ids = await self._ids()
+        pipelines = await asyncio.gather(*(self.get(pipeline_id) for pipeline_id in pipeline_ids))
+        return [
+            (pipeline_id, pipeline_data)
+            for pipeline_id, pipeline_data in zip(pipeline_ids, pipelines)
+            if pipeline_data is not None
+        ]
+
+    async def count(self) -> int:
+        return len(await self._ids())
+
+    async def expire(self):
+        # Entries dropped by TTL don't bump the version, so the id set is part of the check.
+        pipeline_ids = await self._ids()
+        version = (await self.client.get(self.VERSION_KEY), frozenset(pipeline_ids))
+        if version == self._seen_version:
+            return
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for pipeline_id in pipeline_ids:
+                pipe.hmget(self._key(pipeline_id), "status", "completed", "overall_metrics")
+            rows = await pipe.execute()
+
+        self._seen_version = version
+        self.metric_columns = PipelineMetricColumns(max(len(pipeline_ids), 1))
+        for pipeline_id, (status, completed, overall_metrics) in zip(pipeline_ids, rows):
+            if status is None:
+                continue
+            self.metric_columns.set(pipeline_id, {
+                "status": orjson.loads(status),
+                "completed": orjson.loads(completed) if completed else False,
+                "result": {"overall_metrics": orjson.loads(overall_metrics) if overall_metrics else {}}
+            })
+        _invalidate_anomaly_views()
+
+
+if settings.REDIS_URL:
+    active_pipelines = RedisPipelineStore(
+        settings.REDIS_URL,
+        maxsize=settings.MAX_CONCURRENT_PIPELINES * 100,
+        ttl=settings.PIPELINE_TIMEOUT_SECONDS * 2
+    )
+else:
+    active_pipelines = LocalPipelineStore(
+        maxsize=settings.MAX_CONCURRENT_PIPELINES * 100,
+        ttl=settings.PIPELINE_TIMEOUT_SECONDS * 2
+    )
+_pipelines_lock = asyncio.Lock()
+_pipeline_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_PIPELINES)
+
+anomaly_summary_cache: Dict[str, Any] = {}
+
+global_anomalies: List[Dict[str, Any]] = []
+global_anomalies_by_severity: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+_global_anomalies_stale = False
+
+
+def invalidate_anomaly_summary():
+    anomaly_summary_cache.clear()
+
+
+def _invalidate_anomaly_views():
+    global _global_anomalies_stale
+    _global_anomalies_stale = True
+    invalidate_anomaly_summary()
+
+
+def _index_global_anomalies(tagged_anomalies: List[Dict[str, Any]]):
+    global_anomalies.extend(tagged_anomalies)
+    for anomaly in tagged_anomalies:
+        global_anomalies_by_severity[anomaly.get("severity")].append(anomaly)
+
+
+async def get_global_anomalies(severity: Optional[str] = None) -> List[Dict[str, Any]]:
+    global _global_anomalies_stale
+
+    await active_pipelines.expire()
+    if _global_anomalies_stale:
+        pipelines = await active_pipelines.items()
+        global_anomalies.clear()
+        global_anomalies_by_severity.clear()
+        for _, pipeline_data in pipelines:
+            _index_global_anomalies(pipeline_data.get("tagged_anomalies", []))
+        _global_anomalies_stale = False
+
+    if severity:
+        return global_anomalies_by_severity.get(severity, [])
+    return global_anomalies
+
+
+async def remove_pipeline(pipeline_id: str):
+    await active_pipelines.delete(pipeline_id)
+    _invalidate_anomaly_views()
+
+
+def _build_anomaly_index(codes: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    return {
+        "by_severity": group_indices(codes["severity"], "severity"),
+        "by_type": group_indices(codes["anomaly_type"], "anomaly_type")
+    }
+
+
+def _anomaly_views(result: Dict[str, Any], pipeline_id: str) -> Dict[str, Any]:
+    anomalies = result.get("stages", {}).get("anomaly_detection", {}).get("anomalies", [])
+    codes = encode_anomalies(anomalies)
+    return {
+        "anomalies": anomalies,
+        "anomaly_index": _build_anomaly_index(codes),
+        "anomaly_counts": count_anomalies(codes),
+        "tagged_anomalies": [{**anomaly, "pipeline_id": pipeline_id} for anomaly in anomalies]
+    }
 
 
 @router.post("/csv")
@@ -23,16 +393,28 @@ async def ingest_csv(
 ):
     logger.info(f"Received CSV upload: {file.filename}")
 
-    if not file.filename.endswith('.csv'):
+    content_type = (file.content_type or "").split(";")[0].strip().lower()
+    if content_type not in CSV_CONTENT_TYPES or not file.filename.lower().endswith(CSV_EXTENSIONS):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
 
     try:
         file_id = str(uuid.uuid4())
         file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}_{file.filename}")
 
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        bytes_written = 0
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                bytes_written += len(chunk)
+                if bytes_written > settings.MAX_UPLOAD_SIZE:
+                    break
+                await f.write(chunk)
+
+        if bytes_written > settings.MAX_UPLOAD_SIZE:
+            await aiofiles.os.remove(file_path)
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds maximum upload size of {settings.MAX_UPLOAD_SIZE} bytes"
+            )
 
         logger.info(f"Saved file to: {file_path}")
 
@@ -40,11 +422,11 @@ async def ingest_csv(
             pipeline = DataPipeline()
             pipeline_id = pipeline.pipeline_id
 
-            active_pipelines[pipeline_id] = {
+            await active_pipelines.set(pipeline_id, {
                 "status": "running",
                 "file_path": file_path,
                 "file_name": file.filename
-            }
+            })
 
             background_tasks.add_task(
                 execute_pipeline_background,
@@ -71,6 +453,8 @@ async def ingest_csv(
                 "status": "uploaded"
             }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing upload: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
@@ -88,10 +472,10 @@ async def ingest_sql(
         pipeline = DataPipeline()
         pipeline_id = pipeline.pipeline_id
 
-        active_pipelines[pipeline_id] = {
+        await active_pipelines.set(pipeline_id, {
             "status": "running",
             "source_type": "sql"
-        }
+        })
 
         background_tasks.add_task(
             execute_pipeline_background,
@@ -125,11 +509,11 @@ async def ingest_api(
         pipeline = DataPipeline()
         pipeline_id = pipeline.pipeline_id
 
-        active_pipelines[pipeline_id] = {
+        await active_pipelines.set(pipeline_id, {
             "status": "running",
             "source_type": "api",
             "api_endpoint": api_endpoint
-        }
+        })
 
         background_tasks.add_task(
             execute_pipeline_background,
@@ -159,27 +543,36 @@ async def execute_pipeline_background(
     pipeline_id: str,
     **kwargs
 ):
-    try:
-        logger.info(f"Starting background pipeline execution: {pipeline_id}")
-
-        result = await pipeline.execute_full_pipeline(
-            source_type=source_type,
-            source_path=source_path,
-            **kwargs
-        )
-
-        active_pipelines[pipeline_id] = {
-            "status": result.get("status"),
-            "result": result,
-            "completed": True
-        }
-
-        logger.info(f"Pipeline {pipeline_id} completed with status: {result.get('status')}")
+    async with _pipeline_semaphore:
+        try:
+            logger.info(f"Starting background pipeline execution: {pipeline_id}")
+
+            result = await pipeline.execute_full_pipeline(
+                source_type=source_type,
+                source_path=source_path,
+                **kwargs
+            )
 
-    except Exception as e:
-        logger.error(f"Pipeline {pipeline_id} failed: {e}", exc_info=True)
-        active_pipelines[pipeline_id] = {
-            "status": "failed",
-            "error": str(e),
-            "completed": True
-        }
+            anomaly_views = _anomaly_views(result, pipeline_id)
+
+            async with _pipelines_lock:
+                await active_pipelines.set(pipeline_id, {
+                    "status": result.get("status"),
+                    "result": result,
+                    "completed": True,
+                    **anomaly_views
+                })
+                _index_global_anomalies(anomaly_views["tagged_anomalies"])
+                invalidate_anomaly_summary()
+
+            logger.info(f"Pipeline {pipeline_id} completed with status: {result.get('status')}")
+
+        except Exception as e:
+            logger.error(f"Pipeline {pipeline_id} failed: {e}", exc_info=True)
+            async with _pipelines_lock:
+                await active_pipelines.set(pipeline_id, {
+                    "status": "failed",
+                    "error": str(e),
+                    "completed": True
+                })
+                invalidate_anomaly_summary()
@@ -12,22 +12,17 @@ router = APIRouter()
 
 @router.get("/")
 async def get_overall_metrics() -> Dict[str, Any]:
-    total_pipelines = len(active_pipelines)
-    completed = sum(1 for p in active_pipelines.values() if p.get("completed"))
-    failed = sum(1 for p in active_pipelines.values() if p.get("status") == "failed")
-    running = sum(1 for p in active_pipelines.values() if p.get("status") == "running")
+    await active_pipelines.expire()
+    totals = active_pipelines.metric_columns.totals()
 
-    total_rows_processed = 0
-    total_anomalies = 0
-    total_cleaned = 0
+    total_pipelines = await active_pipelines.count()
+    completed = totals["completed"]
+    failed = totals["failed"]
+    running = totals["running"]
 
-    for pipeline_data in active_pipelines.values():
-        result = pipeline_data.get("result", {})
-        overall_metrics = result.get("overall_metrics", {})
-
-        total_rows_processed += overall_metrics.get("total_rows_ingested", 0)
-        total_anomalies += overall_metrics.get("anomalies_detected", 0)
-        total_cleaned += overall_metrics.get("cleaned_rows", 0)
+    total_rows_processed = totals["total_rows_ingested"]
+    total_anomalies = totals["anomalies_detected"]
+    total_cleaned = totals["cleaned_rows"]
 
     return {
         "total_pipelines": total_pipelines,
@@ -43,10 +38,10 @@ async def get_overall_metrics() -> Dict[str, Any]:
 
 @router.get("/{pipeline_id}")
 async def get_pipeline_metrics(pipeline_id: str) -> Dict[str, Any]:
-    if pipeline_id not in active_pipelines:
+    pipeline_data = await active_pipelines.get(pipeline_id)
+    if pipeline_data is None:
         raise HTTPException(status_code=404, detail=f"Pipeline {pipeline_id} not found")
 
-    pipeline_data = active_pipelines[pipeline_id]
     result = pipeline_data.get("result", {})
 
     if not result:
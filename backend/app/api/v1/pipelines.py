@@ -1,9 +1,9 @@
 """Pipeline management API endpoints."""
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
-from app.api.v1.ingestion import active_pipelines
+from app.api.v1.ingestion import active_pipelines, remove_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -11,26 +11,30 @@ router = APIRouter()
 
 
 @router.get("/{pipeline_id}")
-async def get_pipeline_status(pipeline_id: str) -> Dict[str, Any]:
-    if pipeline_id not in active_pipelines:
+async def get_pipeline_status(pipeline_id: str, include: Optional[str] = None) -> Dict[str, Any]:
+    pipeline_data = await active_pipelines.get(pipeline_id)
+    if pipeline_data is None:
         raise HTTPException(status_code=404, detail=f"Pipeline {pipeline_id} not found")
 
-    pipeline_data = active_pipelines[pipeline_id]
+    fields = set(include.split(",")) if include else set()
 
-    return {
+    response = {
         "pipeline_id": pipeline_id,
         "status": pipeline_data.get("status"),
         "completed": pipeline_data.get("completed", False),
-        "result": pipeline_data.get("result"),
         "error": pipeline_data.get("error")
     }
+    if "result" in fields:
+        response["result"] = pipeline_data.get("result")
+
+    return response
 
 
 @router.get("/")
 async def list_pipelines() -> Dict[str, Any]:
     pipelines = []
 
-    for pipeline_id, data in active_pipelines.items():
+    for pipeline_id, data in await active_pipelines.items():
         pipelines.append({
             "pipeline_id": pipeline_id,
             "status": data.get("status"),
@@ -47,11 +51,11 @@ async def list_pipelines() -> Dict[str, Any]:
 
 @router.delete("/{pipeline_id}")
 async def delete_pipeline(pipeline_id: str) -> Dict[str, Any]:
-    if pipeline_id not in active_pipelines:
+    try:
+        await remove_pipeline(pipeline_id)
+    except KeyError:
         raise HTTPException(status_code=404, detail=f"Pipeline {pipeline_id} not found")
 
-    del active_pipelines[pipeline_id]
-
     return {
         "message": "Pipeline deleted successfully",
         "pipeline_id": pipeline_id
@@ -1,7 +1,8 @@
 """Application configuration management."""
+from functools import lru_cache
 from typing import List
-from pydantic_settings import BaseSettings
-from pydantic import Field, validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, field_validator
 import os
 
 
@@ -21,10 +22,18 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
 
+    REDIS_URL: str = Field(
+        default="",
+        description="Redis URL for the shared pipeline store; empty keeps state in-process"
+    )
+
     WATSONX_API_KEY: str = Field(default="", description="IBM Watsonx API Key")
     WATSONX_PROJECT_ID: str = Field(default="", description="Watsonx Project ID")
     WATSONX_URL: str = "https://us-south.ml.cloud.ibm.com"
     WATSONX_VERSION: str = "2024-01-01"
+    WATSONX_IAM_URL: str = "https://iam.cloud.ibm.com/identity/token"
+    WATSONX_MAX_CONNECTIONS: int = 64
+    WATSONX_MAX_CONCURRENCY: int = 16
 
     IBM_CLOUD_API_KEY: str = Field(default="", description="IBM Cloud API Key")
     IBM_CLOUD_REGION: str = "us-south"
@@ -32,6 +41,9 @@ class Settings(BaseSettings):
     WATSONX_MODEL_ID: str = "ibm/granite-13b-chat-v2"
     WATSONX_MAX_TOKENS: int = 1000
     WATSONX_TEMPERATURE: float = 0.7
+    WATSONX_CACHE_SIZE: int = 10000
+    WATSONX_CACHE_PATH: str = "./cache/watsonx_responses.sqlite3"
+    WATSONX_CACHE_TTL_SECONDS: int = 604800
 
     UPLOAD_DIR: str = "./uploads"
     PROCESSED_DIR: str = "./processed"
@@ -43,6 +55,9 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
+    ACCESS_LOG: bool = False
+
+    WORKERS: int = 1
 
     MAX_CONCURRENT_PIPELINES: int = 5
     PIPELINE_TIMEOUT_SECONDS: int = 3600
@@ -57,7 +72,8 @@ class Settings(BaseSettings):
     ]
     MAX_NULL_PERCENTAGE: float = 0.05
 
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
+    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @classmethod
     def assemble_cors_origins(cls, v):
         if isinstance(v, str):
             return [i.strip() for i in v.split(",")]
@@ -67,10 +83,14 @@ class Settings(BaseSettings):
         os.makedirs(self.UPLOAD_DIR, exist_ok=True)
         os.makedirs(self.PROCESSED_DIR, exist_ok=True)
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    settings = Settings()
+    settings.create_directories()
+    return settings
 
 
-settings = Settings()
-settings.create_directories()
+settings = get_settings()
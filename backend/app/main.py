@@ -1,15 +1,36 @@
 """FastAPI main application entry point."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import configure_mappers
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import importlib
 import logging
+import orjson
+import os
+import queue
+import time
 
 from app.config import settings
 from app.api.v1 import router as api_v1_router
-
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from app.db import engine
+from app.middleware import TimedORJSONResponse, TimingMiddleware
+from app.watsonx.client import watsonx_client
+
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
+logging.getLogger().setLevel(getattr(logging, settings.LOG_LEVEL))
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+log_listener.start()
+
+logging.getLogger("uvicorn.access").setLevel(
+    logging.INFO if settings.ACCESS_LOG or settings.DEBUG else logging.WARNING
 )
 
 logger = logging.getLogger(__name__)
@@ -20,9 +41,11 @@ app = FastAPI(
     description="IBM Watsonx Banking Data Cleaning Pipeline API",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
+    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    default_response_class=TimedORJSONResponse
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
@@ -30,6 +53,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TimingMiddleware)
 
 
 @app.on_event("startup")
@@ -37,29 +61,65 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
+    warm_up()
+
+
+def warm_up():
+    start = time.perf_counter()
+
+    for route in app.routes:
+        response_model = getattr(route, "response_model", None)
+        if response_model is None:
+            continue
+        if isinstance(response_model, type) and issubclass(response_model, BaseModel):
+            response_model.model_rebuild()
+        TypeAdapter(response_model)
+
+    importlib.import_module("app.models")
+    configure_mappers()
+
+    logger.info(f"Warm-up completed in {(time.perf_counter() - start) * 1000:.1f} ms")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down application")
+    await engine.dispose()
+    await watsonx_client.aclose()
+    log_listener.stop()
+
+
+_ROOT_BODY = orjson.dumps({
+    "message": "IBM Watsonx Banking Data Cleaning Pipeline",
+    "version": settings.APP_VERSION,
+    "environment": settings.ENVIRONMENT,
+    "docs": "/docs"
+})
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "version": settings.APP_VERSION
+})
 
 
-@app.get("/")
+@app.get("/", response_class=Response)
 async def root():
-    return {
-        "message": "IBM Watsonx Banking Data Cleaning Pipeline",
-        "version": settings.APP_VERSION,
-        "environment": settings.ENVIRONMENT,
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
-@app.get("/health")
+@app.get("/health", response_class=Response)
 async def health_check():
-    return {
-        "status": "healthy",
-        "version": settings.APP_VERSION
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Under gunicorn each worker writes its own files; merge them so one scrape covers the pool.
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
 
 
 app.include_router(api_v1_router, prefix=settings.API_V1_PREFIX)
@@ -68,7 +128,7 @@ app.include_router(api_v1_router, prefix=settings.API_V1_PREFIX)
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -83,5 +143,9 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        access_log=settings.ACCESS_LOG or settings.DEBUG,
+        loop="uvloop",
+        http="httptools",
+        workers=1 if settings.DEBUG else settings.WORKERS
     )
@@ -0,0 +1,59 @@
+"""Request timing middleware splitting handler time from response rendering."""
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from time import perf_counter_ns
+
+from fastapi.responses import ORJSONResponse
+from prometheus_client import Histogram
+from starlette.middleware.base import BaseHTTPMiddleware
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Total request handling time",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+RENDER_SECONDS = Histogram(
+    "http_request_render_seconds",
+    "Response serialization time",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+
+# Holds a per-request dict; the handler runs in a child task, so it is mutated rather than re-set.
+_request_timings: ContextVar[Optional[Dict[str, int]]] = ContextVar("request_timings", default=None)
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        start = perf_counter_ns()
+        body = super().render(content)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings["render_ns"] = timings.get("render_ns", 0) + perf_counter_ns() - start
+        return body
+
+
+class TimingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        timings = {}
+        token = _request_timings.set(timings)
+        start = perf_counter_ns()
+        try:
+            response = await call_next(request)
+        finally:
+            _request_timings.reset(token)
+        total_ns = perf_counter_ns() - start
+
+        render_ns = timings.get("render_ns", 0)
+        route = request.scope.get("route")
+        labels = (request.method, route.path if route is not None else "unmatched")
+        REQUEST_SECONDS.labels(*labels).observe(total_ns / 1e9)
+        RENDER_SECONDS.labels(*labels).observe(render_ns / 1e9)
+
+        response.headers["Server-Timing"] = (
+            f"app;dur={(total_ns - render_ns) / 1e6:.1f}, render;dur={render_ns / 1e6:.1f}"
+        )
+        return response
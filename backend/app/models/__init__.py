@@ -2,6 +2,7 @@
 from app.models.base import Base
 from app.models.dataset import Dataset
 from app.models.transaction import Transaction
+from app.models.transaction_details import TransactionDetails
 from app.models.pipeline_run import PipelineRun
 from app.models.anomaly import Anomaly
 from app.models.metadata import DatasetMetadata
@@ -10,6 +11,7 @@ __all__ = [
     "Base",
     "Dataset",
     "Transaction",
+    "TransactionDetails",
     "PipelineRun",
     "Anomaly",
     "DatasetMetadata",
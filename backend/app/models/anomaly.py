@@ -1,39 +1,46 @@
 """Anomaly model for tracking detected anomalies."""
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
+from typing import Any, Dict, Iterable
 import enum
+import orjson
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, IntEnumType
 
 
-class AnomalyType(str, enum.Enum):
-    NEGATIVE_BALANCE = "negative_balance"
-    DUPLICATE_TRANSACTION = "duplicate_transaction"
-    INVALID_DATE = "invalid_date"
-    SUSPICIOUS_AMOUNT = "suspicious_amount"
-    STATUS_MISMATCH = "status_mismatch"
-    MISSING_REQUIRED_FIELD = "missing_required_field"
-    INVALID_FORMAT = "invalid_format"
-    OUTLIER = "outlier"
-    SEMANTIC_INCONSISTENCY = "semantic_inconsistency"
-    OTHER = "other"
+class AnomalyType(enum.IntEnum):
+    NEGATIVE_BALANCE = 1
+    DUPLICATE_TRANSACTION = 2
+    INVALID_DATE = 3
+    SUSPICIOUS_AMOUNT = 4
+    STATUS_MISMATCH = 5
+    MISSING_REQUIRED_FIELD = 6
+    INVALID_FORMAT = 7
+    OUTLIER = 8
+    SEMANTIC_INCONSISTENCY = 9
+    OTHER = 10
 
 
-class AnomalySeverity(str, enum.Enum):
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
-    CRITICAL = "critical"
+class AnomalySeverity(enum.IntEnum):
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
 
 
 class Anomaly(BaseModel):
     __tablename__ = "anomalies"
+    __table_args__ = (
+        Index("ix_anomaly_dataset_type_severity", "dataset_id", "anomaly_type", "severity"),
+        Index("ix_anomaly_unresolved", "dataset_id", postgresql_where=text("NOT is_resolved")),
+    )
 
     dataset_id = Column(Integer, ForeignKey("datasets.id", ondelete="CASCADE"), nullable=False)
     transaction_id = Column(String, nullable=True)
 
-    anomaly_type = Column(SQLEnum(AnomalyType), nullable=False)
-    severity = Column(SQLEnum(AnomalySeverity), default=AnomalySeverity.MEDIUM, nullable=False)
+    anomaly_type = Column(IntEnumType(AnomalyType), nullable=False)
+    severity = Column(IntEnumType(AnomalySeverity), default=AnomalySeverity.MEDIUM, nullable=False)
 
     confidence_score = Column(Float, nullable=False)
     detected_by = Column(String, nullable=False)
@@ -43,16 +50,62 @@ class Anomaly(BaseModel):
     original_value = Column(String, nullable=True)
     expected_value = Column(String, nullable=True)
 
-    context = Column(JSON, nullable=True)
+    context = Column(JSONB, nullable=True)
 
-    is_resolved = Column(Integer, default=0, nullable=False)
+    is_resolved = Column(Boolean, default=False, nullable=False)
     resolution_action = Column(String, nullable=True)
     resolved_value = Column(String, nullable=True)
 
     llm_explanation = Column(String, nullable=True)
     llm_model_id = Column(String, nullable=True)
 
-    dataset = relationship("Dataset", back_populates="anomalies")
+    dataset = relationship("Dataset", back_populates="anomalies", lazy="raise")
+
+    COPY_COLUMNS = (
+        "dataset_id",
+        "transaction_id",
+        "anomaly_type",
+        "severity",
+        "confidence_score",
+        "detected_by",
+        "description",
+        "field_name",
+        "original_value",
+        "expected_value",
+        "context"
+    )
+
+    @classmethod
+    async def bulk_copy(cls, session, rows: Iterable[Dict[str, Any]]) -> int:
+        """COPY rows (keyed by column name) into anomalies over the session's asyncpg connection."""
+        anomaly_type = cls.__table__.c.anomaly_type.type
+        severity = cls.__table__.c.severity.type
+
+        records = [
+            (
+                row["dataset_id"],
+                row.get("transaction_id"),
+                anomaly_type.process_bind_param(row["anomaly_type"], None),
+                severity.process_bind_param(row.get("severity", AnomalySeverity.MEDIUM), None),
+                row["confidence_score"],
+                row["detected_by"],
+                row["description"],
+                row.get("field_name"),
+                row.get("original_value"),
+                row.get("expected_value"),
+                orjson.dumps(row["context"]).decode() if row.get("context") is not None else None
+            )
+            for row in rows
+        ]
+        if not records:
+            return 0
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            cls.__tablename__, records=records, columns=cls.COPY_COLUMNS
+        )
+        return len(records)
 
     def __repr__(self):
         return f"<Anomaly(type={self.anomaly_type}, severity={self.severity}, confidence={self.confidence_score})>"
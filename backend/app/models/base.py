@@ -1,6 +1,8 @@
 """Base SQLAlchemy model with common fields."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import Column, Integer, BigInteger, DateTime, SmallInteger
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
@@ -8,6 +10,52 @@ from sqlalchemy.ext.asyncio import AsyncAttrs
 Base = declarative_base()
 
 
+class IntEnumType(TypeDecorator):
+    """Stores an IntEnum as a SMALLINT code; also binds lowercase member names."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+        self._codes = {
+            **{int(member): int(member) for member in enum_class},
+            **{member.name.lower(): int(member) for member in enum_class}
+        }
+        self._members = {int(member): member for member in enum_class}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        code = self._codes.get(value.lower() if isinstance(value, str) else value)
+        if code is None:
+            raise ValueError(f"{value!r} is not a valid {self.enum_class.__name__}")
+        return code
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value]
+
+
+class MoneyCents(TypeDecorator):
+    """Stores a two-decimal money amount as BIGINT cents; loads back as Decimal."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int((Decimal(str(value)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Decimal(value).scaleb(-2)
+
+
 class TimestampMixin:
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,18 +1,20 @@
 """Dataset model for tracking uploaded datasets."""
-from sqlalchemy import Column, String, Integer, Float, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, SmallInteger
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import enum
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, IntEnumType
 
 
-class DatasetStatus(str, enum.Enum):
-    UPLOADED = "uploaded"
-    VALIDATING = "validating"
-    CLEANING = "cleaning"
-    ANALYZING = "analyzing"
-    COMPLETED = "completed"
-    FAILED = "failed"
+class DatasetStatus(enum.IntEnum):
+    UPLOADED = 1
+    VALIDATING = 2
+    CLEANING = 3
+    ANALYZING = 4
+    COMPLETED = 5
+    FAILED = 6
 
 
 class Dataset(BaseModel):
@@ -21,7 +23,7 @@ class Dataset(BaseModel):
     name = Column(String, nullable=False)
     source_type = Column(String, nullable=False)
     file_path = Column(String, nullable=True)
-    status = Column(SQLEnum(DatasetStatus), default=DatasetStatus.UPLOADED, nullable=False)
+    status = Column(IntEnumType(DatasetStatus), default=DatasetStatus.UPLOADED, nullable=False)
 
     total_rows = Column(Integer, default=0)
     valid_rows = Column(Integer, default=0)
@@ -29,14 +31,20 @@ class Dataset(BaseModel):
     cleaned_rows = Column(Integer, default=0)
     anomaly_count = Column(Integer, default=0)
 
-    quality_score = Column(Float, default=0.0)
+    quality_score = Column(SmallInteger, default=0)
 
     processing_time_seconds = Column(Float, nullable=True)
     error_message = Column(String, nullable=True)
 
-    pipeline_config = Column(JSON, nullable=True)
+    pipeline_config = Column(JSONB, nullable=True)
 
     transactions = relationship("Transaction", back_populates="dataset", cascade="all, delete-orphan")
     pipeline_runs = relationship("PipelineRun", back_populates="dataset", cascade="all, delete-orphan")
     anomalies = relationship("Anomaly", back_populates="dataset", cascade="all, delete-orphan")
-    metadata = relationship("DatasetMetadata", back_populates="dataset", uselist=False, cascade="all, delete-orphan")
+    dataset_metadata = relationship(
+        "DatasetMetadata", back_populates="dataset", uselist=False, lazy="joined", cascade="all, delete-orphan"
+    )
+
+    @hybrid_property
+    def quality_pct(self):
+        return self.quality_score / 100.0
@@ -1,6 +1,8 @@
 """Dataset metadata model for storing processing statistics."""
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, SmallInteger, ForeignKey
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 
 from app.models.base import BaseModel
 
@@ -10,36 +12,52 @@ class DatasetMetadata(BaseModel):
 
     dataset_id = Column(Integer, ForeignKey("datasets.id", ondelete="CASCADE"), unique=True, nullable=False)
 
-    columns = Column(JSON, nullable=True)
+    columns = Column(JSONB, nullable=True)
     column_count = Column(Integer, default=0)
 
-    completeness_score = Column(Float, default=0.0)
-    validity_score = Column(Float, default=0.0)
-    consistency_score = Column(Float, default=0.0)
-    accuracy_score = Column(Float, default=0.0)
+    completeness_score = Column(SmallInteger, default=0)
+    validity_score = Column(SmallInteger, default=0)
+    consistency_score = Column(SmallInteger, default=0)
+    accuracy_score = Column(SmallInteger, default=0)
 
-    null_counts = Column(JSON, nullable=True)
-    null_percentages = Column(JSON, nullable=True)
+    null_counts = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
+    null_percentages = Column(JSONB, nullable=True)
 
-    data_types = Column(JSON, nullable=True)
-    type_violations = Column(JSON, nullable=True)
+    data_types = Column(JSONB, nullable=True)
+    type_violations = Column(JSONB, nullable=True)
 
-    unique_counts = Column(JSON, nullable=True)
-    value_distributions = Column(JSON, nullable=True)
+    unique_counts = Column(JSONB, nullable=True)
+    value_distributions = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
 
-    numeric_stats = Column(JSON, nullable=True)
+    numeric_stats = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
 
-    date_range = Column(JSON, nullable=True)
+    date_range = Column(JSONB, nullable=True)
 
-    cleaning_summary = Column(JSON, nullable=True)
+    cleaning_summary = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
 
-    transformations = Column(JSON, nullable=True)
+    transformations = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
 
     file_size_bytes = Column(Integer, nullable=True)
     file_format = Column(String, nullable=True)
     encoding = Column(String, nullable=True)
 
-    dataset = relationship("Dataset", back_populates="metadata")
+    dataset = relationship("Dataset", back_populates="dataset_metadata", lazy="raise")
+
+    @hybrid_property
+    def completeness_pct(self):
+        return self.completeness_score / 100.0
+
+    @hybrid_property
+    def validity_pct(self):
+        return self.validity_score / 100.0
+
+    @hybrid_property
+    def consistency_pct(self):
+        return self.consistency_score / 100.0
+
+    @hybrid_property
+    def accuracy_pct(self):
+        return self.accuracy_score / 100.0
 
     def __repr__(self):
         return f"<DatasetMetadata(dataset_id={self.dataset_id}, quality_score={self.validity_score})>"
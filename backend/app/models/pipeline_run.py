@@ -1,56 +1,64 @@
 """Pipeline run model for tracking execution history."""
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, IntEnumType
 
 
-class PipelineStage(str, enum.Enum):
-    INGESTION = "ingestion"
-    VALIDATION = "validation"
-    CLEANING = "cleaning"
-    ANOMALY_DETECTION = "anomaly_detection"
-    REVIEW = "review"
-    PUBLISHING = "publishing"
+class PipelineStage(enum.IntEnum):
+    INGESTION = 1
+    VALIDATION = 2
+    CLEANING = 3
+    ANOMALY_DETECTION = 4
+    REVIEW = 5
+    PUBLISHING = 6
 
 
-class PipelineStatus(str, enum.Enum):
-    PENDING = "pending"
-    RUNNING = "running"
-    COMPLETED = "completed"
-    FAILED = "failed"
-    CANCELLED = "cancelled"
+class PipelineStatus(enum.IntEnum):
+    PENDING = 1
+    RUNNING = 2
+    COMPLETED = 3
+    FAILED = 4
+    CANCELLED = 5
 
 
 class PipelineRun(BaseModel):
     __tablename__ = "pipeline_runs"
+    __table_args__ = (
+        Index("ix_run_dataset_started", "dataset_id", "started_at"),
+    )
 
     dataset_id = Column(Integer, ForeignKey("datasets.id", ondelete="CASCADE"), nullable=False)
 
     run_id = Column(String, unique=True, index=True, nullable=False)
-    stage = Column(SQLEnum(PipelineStage), nullable=False)
-    status = Column(SQLEnum(PipelineStatus), default=PipelineStatus.PENDING, nullable=False)
+    stage = Column(IntEnumType(PipelineStage), nullable=False)
+    status = Column(IntEnumType(PipelineStatus), default=PipelineStatus.PENDING, nullable=False)
 
     started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     completed_at = Column(DateTime, nullable=True)
-    duration_seconds = Column(Float, nullable=True)
+    duration_seconds = Column(
+        Float,
+        Computed("EXTRACT(EPOCH FROM (completed_at - started_at))", persisted=True),
+        nullable=True
+    )
 
     input_rows = Column(Integer, default=0)
     output_rows = Column(Integer, default=0)
     rows_modified = Column(Integer, default=0)
     rows_removed = Column(Integer, default=0)
 
-    stage_metrics = Column(JSON, nullable=True)
+    stage_metrics = Column(JSONB, nullable=True)
 
     error_message = Column(String, nullable=True)
-    logs = Column(JSON, nullable=True)
+    logs = Column(JSONB, nullable=True)
 
     watsonx_node_id = Column(String, nullable=True)
     watsonx_execution_id = Column(String, nullable=True)
 
-    dataset = relationship("Dataset", back_populates="pipeline_runs")
+    dataset = relationship("Dataset", back_populates="pipeline_runs", lazy="raise")
 
     def __repr__(self):
         return f"<PipelineRun(id={self.run_id}, stage={self.stage}, status={self.status})>"
@@ -0,0 +1,32 @@
+"""Transaction details model for wide, rarely-scanned transaction fields."""
+from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
+
+from app.models.base import BaseModel
+
+
+class TransactionDetails(BaseModel):
+    __tablename__ = "transaction_details"
+
+    transaction_id = Column(
+        String,
+        ForeignKey("transactions.transaction_id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False
+    )
+
+    account_number = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    merchant = Column(String, nullable=True)
+    category = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+
+    original_values = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
+    cleaning_actions = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
+    validation_errors = deferred(Column(JSONB, nullable=True), group="blobs", raiseload=True)
+
+    transaction = relationship("Transaction", back_populates="details", lazy="raise")
+
+    def __repr__(self):
+        return f"<TransactionDetails(transaction_id={self.transaction_id})>"
@@ -1,47 +1,130 @@
 """IBM Watsonx AI client for model inference and orchestration."""
 from typing import Optional, Dict, Any, List
-from ibm_watsonx_ai import APIClient, Credentials
-from ibm_watsonx_ai.foundation_models import ModelInference
-from ibm_watsonx_ai.metanames import GenTextParamsMetaNames as GenParams
+from cachetools import LRUCache
+import asyncio
+import hashlib
+import httpx
 import logging
+import math
+import orjson
+import re
+import sqlite3
+import time
 
 from app.config import settings
+from app.watsonx.response_cache import PersistentResponseCache
 
 logger = logging.getLogger(__name__)
 
+RETRY_STATUS_CODES = (429, 503, 504, 520)
+RETRY_ATTEMPTS = 3
+_JSON_OBJECT = re.compile(r'\{.*\}', re.S)
+_JSON_ARRAY = re.compile(r'\[.*\]', re.S)
+_ANOMALY_RUBRIC = """Look for the following types of anomalies:
+1. Negative balance with completed status
+2. Suspicious amount patterns (very high or very low)
+3. Invalid date/time inconsistencies
+4. Status mismatches with transaction type
+5. Semantic inconsistencies in description vs. amount/type
+
+"""
+
+ANOMALY_PROMPT_PREFIX = (
+    "You are a banking fraud detection expert. Analyze the transaction below for anomalies or suspicious patterns.\n\n"
+    + _ANOMALY_RUBRIC
+    + 'Respond with ONLY a JSON object with keys: is_anomaly (boolean), confidence (number 0.0-1.0), '
+    'anomaly_type (string), severity ("low", "medium", "high" or "critical"), explanation (string of at most 20 words).\n\n'
+)
+
+BATCH_ANOMALY_PROMPT_PREFIX = (
+    "You are a banking fraud detection expert. Analyze each transaction below for anomalies or suspicious patterns.\n\n"
+    + _ANOMALY_RUBRIC
+    + "Respond with ONLY a JSON array containing one object per transaction, with keys: transaction (transaction number), "
+    'is_anomaly (boolean), confidence (number 0.0-1.0), anomaly_type (string), '
+    'severity ("low", "medium", "high" or "critical"), explanation (string of at most 20 words).\n\n'
+)
+
+_DIGITS = re.compile(r'\d+')
+_WS = re.compile(r'\s+')
+
+
+def _load_json(pattern: re.Pattern, response: str) -> Any:
+    match = pattern.search(response)
+    if not match:
+        return None
+    try:
+        return orjson.loads(match.group(0))
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
 
 class WatsonxClient:
     def __init__(self):
-        self.credentials = Credentials(
-            url=settings.WATSONX_URL,
-            api_key=settings.WATSONX_API_KEY,
-        )
-
-        self.client = APIClient(self.credentials)
+        self.api_key = settings.WATSONX_API_KEY
         self.project_id = settings.WATSONX_PROJECT_ID
         self.model_id = settings.WATSONX_MODEL_ID
+        self.default_params = {
+            "max_new_tokens": settings.WATSONX_MAX_TOKENS,
+            "temperature": settings.WATSONX_TEMPERATURE,
+            "top_k": 50,
+            "top_p": 1.0,
+        }
 
-        self.model = None
-        if self.credentials.api_key and self.project_id:
-            self._initialize_model()
+        self.http = httpx.AsyncClient(
+            base_url=settings.WATSONX_URL,
+            limits=httpx.Limits(
+                max_connections=settings.WATSONX_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WATSONX_MAX_CONNECTIONS,
+                keepalive_expiry=300.0
+            ),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        self._access_token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(settings.WATSONX_MAX_CONCURRENCY)
 
-    def _initialize_model(self):
-        try:
-            self.model = ModelInference(
-                model_id=self.model_id,
-                api_client=self.client,
-                project_id=self.project_id,
-                params={
-                    GenParams.MAX_NEW_TOKENS: settings.WATSONX_MAX_TOKENS,
-                    GenParams.TEMPERATURE: settings.WATSONX_TEMPERATURE,
-                    GenParams.TOP_K: 50,
-                    GenParams.TOP_P: 1.0,
-                }
-            )
+        self.enabled = bool(self.api_key and self.project_id)
+        if self.enabled:
             logger.info(f"Initialized Watsonx model: {self.model_id}")
-        except Exception as e:
-            logger.error(f"Failed to initialize Watsonx model: {e}")
-            self.model = None
+
+        self._anomaly_cache = LRUCache(maxsize=settings.WATSONX_CACHE_SIZE)
+        self._response_store: Optional[PersistentResponseCache] = None
+        if settings.WATSONX_CACHE_PATH:
+            try:
+                self._response_store = PersistentResponseCache(
+                    settings.WATSONX_CACHE_PATH, settings.WATSONX_CACHE_TTL_SECONDS
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Persistent response cache disabled: {e}")
+
+    async def _get_access_token(self) -> str:
+        async with self._token_lock:
+            if self._access_token and time.monotonic() < self._token_expires_at:
+                return self._access_token
+
+            response = await self.http.post(
+                settings.WATSONX_IAM_URL,
+                data={
+                    "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
+                    "apikey": self.api_key
+                },
+                headers={"Accept": "application/json"}
+            )
+            response.raise_for_status()
+            token = response.json()
+
+            self._access_token = token["access_token"]
+            self._token_expires_at = time.monotonic() + token.get("expires_in", 3600) - 60
+            return self._access_token
 
     async def generate_text(
         self,
@@ -49,36 +132,70 @@ class WatsonxClient:
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None
     ) -> str:
-        if not self.model:
+        if not self.enabled:
             raise ValueError("Watsonx model not initialized. Check API credentials.")
 
         try:
-            params = {}
+            params = dict(self.default_params)
             if max_tokens:
-                params[GenParams.MAX_NEW_TOKENS] = max_tokens
+                params["max_new_tokens"] = max_tokens
             if temperature is not None:
-                params[GenParams.TEMPERATURE] = temperature
+                params["temperature"] = temperature
 
-            response = self.model.generate(prompt=prompt, params=params if params else None)
+            payload = {
+                "model_id": self.model_id,
+                "project_id": self.project_id,
+                "input": prompt,
+                "parameters": params
+            }
 
-            if isinstance(response, dict):
-                return response.get("results", [{}])[0].get("generated_text", "")
-            return str(response)
+            for attempt in range(RETRY_ATTEMPTS):
+                last_attempt = attempt == RETRY_ATTEMPTS - 1
+                headers = {"Authorization": f"Bearer {await self._get_access_token()}"}
+                try:
+                    async with self._semaphore:
+                        response = await self.http.post(
+                            "/ml/v1/text/generation",
+                            params={"version": settings.WATSONX_VERSION},
+                            json=payload,
+                            headers=headers
+                        )
+                except httpx.TransportError as e:
+                    # Covers timeouts and resets on stale pooled keep-alive connections.
+                    if last_attempt:
+                        raise
+                    logger.warning(f"Watsonx request failed ({e!r}), retrying")
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                        break
+                await asyncio.sleep(2 ** attempt)
+
+            response.raise_for_status()
+            return response.json().get("results", [{}])[0].get("generated_text", "")
 
         except Exception as e:
             logger.error(f"Error generating text with Watsonx: {e}")
             raise
 
+    async def aclose(self):
+        await self.http.aclose()
+        if self._response_store is not None:
+            self._response_store.close()
+
     async def detect_anomaly(
         self,
         transaction_data: Dict[str, Any],
         context: Optional[str] = None
     ) -> Dict[str, Any]:
+        key = self.fingerprint(transaction_data, context)
+        cached = (await self._cached_results([key])).get(key)
+        if cached is not None:
+            return self._for_transaction(cached, transaction_data)
+
         prompt = self._build_anomaly_detection_prompt(transaction_data, context)
 
         try:
-            response = await self.generate_text(prompt, max_tokens=500, temperature=0.3)
-            return self._parse_anomaly_response(response, transaction_data)
+            response = await self.generate_text(prompt, max_tokens=128, temperature=0.3)
         except Exception as e:
             logger.error(f"Error in anomaly detection: {e}")
             return {
@@ -87,47 +204,184 @@ class WatsonxClient:
                 "explanation": f"Error: {str(e)}"
             }
 
-    def _build_anomaly_detection_prompt(
+        result = self._parse_anomaly_response(response, transaction_data)
+        if result is None:
+            # Unparseable replies fall back to the default result but are never cached.
+            return self._anomaly_result({}, response, transaction_data)
+
+        await self._store_results({key: result})
+        return result
+
+    async def detect_anomalies_batch(
         self,
-        transaction: Dict[str, Any],
+        transactions: List[Dict[str, Any]],
         context: Optional[str] = None
-    ) -> str:
-        prompt = f"""You are a banking fraud detection expert. Analyze the following transaction for anomalies or suspicious patterns.
+    ) -> List[Dict[str, Any]]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transactions)
+        pending: Dict[str, List[int]] = {}
 
-Transaction Details:
-- Transaction ID: {transaction.get('transaction_id', 'N/A')}
-- Customer ID: {transaction.get('customer_id', 'N/A')}
-- Amount: {transaction.get('amount', 'N/A')} {transaction.get('currency', 'USD')}
-- Balance: {transaction.get('balance', 'N/A')}
-- Date: {transaction.get('transaction_date', 'N/A')}
-- Type: {transaction.get('transaction_type', 'N/A')}
-- Status: {transaction.get('status', 'N/A')}
-- Description: {transaction.get('description', 'N/A')}
+        keys = [self.fingerprint(transaction, context) for transaction in transactions]
+        cached = await self._cached_results(list(dict.fromkeys(keys)))
 
-{f"Additional Context: {context}" if context else ""}
+        for position, (key, transaction) in enumerate(zip(keys, transactions)):
+            if key in cached:
+                results[position] = self._for_transaction(cached[key], transaction)
+            else:
+                pending.setdefault(key, []).append(position)
 
-Analyze this transaction for the following types of anomalies:
-1. Negative balance with completed status
-2. Suspicious amount patterns (very high or very low)
-3. Invalid date/time inconsistencies
-4. Status mismatches with transaction type
-5. Semantic inconsistencies in description vs. amount/type
+        if not pending:
+            return results
 
-Respond in the following format:
-IS_ANOMALY: [YES/NO]
-CONFIDENCE: [0.0-1.0]
-ANOMALY_TYPE: [type if anomaly detected]
-SEVERITY: [LOW/MEDIUM/HIGH/CRITICAL]
-EXPLANATION: [Brief explanation]
-"""
+        batch = [transactions[positions[0]] for positions in pending.values()]
+        prompt = self._build_batch_anomaly_detection_prompt(batch, context)
+
+        try:
+            response = await self.generate_text(prompt, max_tokens=120 * len(batch), temperature=0.3)
+        except Exception as e:
+            logger.error(f"Error in batch anomaly detection: {e}")
+            for positions in pending.values():
+                for position in positions:
+                    results[position] = {
+                        "is_anomaly": False,
+                        "confidence": 0.0,
+                        "explanation": f"Error: {str(e)}"
+                    }
+            return results
+
+        parsed = self._parse_batch_anomaly_response(response, batch)
+        fresh: Dict[str, Dict[str, Any]] = {}
+
+        for (key, positions), result in zip(pending.items(), parsed):
+            if result is None:
+                result = {
+                    "is_anomaly": False,
+                    "confidence": 0.0,
+                    "explanation": "No response for transaction"
+                }
+            else:
+                fresh[key] = result
+            for position in positions:
+                results[position] = self._for_transaction(result, transactions[position])
+
+        await self._store_results(fresh)
+        return results
+
+    def fingerprint(self, transaction: Dict[str, Any], context: Optional[str] = None) -> str:
+        amount = _to_float(transaction.get('amount'))
+        balance = _to_float(transaction.get('balance'))
+        if amount is None:
+            amount_bucket = "none"
+        else:
+            amount_bucket = f"{'-' if amount < 0 else ''}{round(math.log10(max(abs(amount), 1)), 1)}"
+        description = _WS.sub(' ', _DIGITS.sub('#', str(transaction.get('description', '')).lower())).strip()
+
+        fingerprint = "|".join([
+            str(transaction.get('status', '')).lower(),
+            str(transaction.get('transaction_type', '')).lower(),
+            str(transaction.get('currency', 'USD')).upper(),
+            amount_bucket,
+            "none" if balance is None else str(balance < 0),
+            description,
+            context or ""
+        ])
+        return hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+
+    async def _cached_results(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {key: self._anomaly_cache[key] for key in keys if key in self._anomaly_cache}
+        missing = [key for key in keys if key not in found]
+        if missing and self._response_store is not None:
+            # SQLite can block on a lock held by another worker, so keep it off the event loop.
+            stored = await asyncio.to_thread(self._response_store.get_many, missing)
+            self._anomaly_cache.update(stored)
+            found.update(stored)
+        return found
+
+    async def _store_results(self, results: Dict[str, Dict[str, Any]]):
+        if not results:
+            return
+        self._anomaly_cache.update(results)
+        if self._response_store is not None:
+            await asyncio.to_thread(self._response_store.set_many, results)
+
+    def _for_transaction(self, result: Dict[str, Any], transaction: Dict[str, Any]) -> Dict[str, Any]:
+        if "transaction_id" not in result:
+            return dict(result)
+        return {**result, "transaction_id": transaction.get("transaction_id")}
+
+    def _format_transaction(self, transaction: Dict[str, Any]) -> str:
+        return "".join([
+            f"- Transaction ID: {transaction.get('transaction_id', 'N/A')}\n",
+            f"- Customer ID: {transaction.get('customer_id', 'N/A')}\n",
+            f"- Amount: {transaction.get('amount', 'N/A')} {transaction.get('currency', 'USD')}\n",
+            f"- Balance: {transaction.get('balance', 'N/A')}\n",
+            f"- Date: {transaction.get('transaction_date', 'N/A')}\n",
+            f"- Type: {transaction.get('transaction_type', 'N/A')}\n",
+            f"- Status: {transaction.get('status', 'N/A')}\n",
+            f"- Description: {transaction.get('description', 'N/A')}\n",
+        ])
+
+    def _build_anomaly_detection_prompt(
+        self,
+        transaction: Dict[str, Any],
+        context: Optional[str] = None
+    ) -> str:
+        prompt = ANOMALY_PROMPT_PREFIX + "Transaction Details:\n" + self._format_transaction(transaction)
+        if context:
+            prompt += f"\nAdditional Context: {context}\n"
+        return prompt
+
+    def _build_batch_anomaly_detection_prompt(
+        self,
+        transactions: List[Dict[str, Any]],
+        context: Optional[str] = None
+    ) -> str:
+        prompt = BATCH_ANOMALY_PROMPT_PREFIX + "\n".join(
+            f"Transaction {position}:\n{self._format_transaction(transaction)}"
+            for position, transaction in enumerate(transactions, start=1)
+        )
+        if context:
+            prompt += f"\nAdditional Context: {context}\n"
         return prompt
 
     def _parse_anomaly_response(
         self,
         response: str,
         transaction: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        data = _load_json(_JSON_OBJECT, response)
+        if not isinstance(data, dict):
+            return None
+        return self._anomaly_result(data, response, transaction)
+
+    def _parse_batch_anomaly_response(
+        self,
+        response: str,
+        transactions: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transactions)
+
+        items = _load_json(_JSON_ARRAY, response)
+        if not isinstance(items, list):
+            return results
+
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                position = int(item.get("transaction")) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= position < len(transactions) and results[position] is None:
+                results[position] = self._anomaly_result(item, orjson.dumps(item).decode(), transactions[position])
+
+        return results
+
+    def _anomaly_result(
+        self,
+        data: Dict[str, Any],
+        response: str,
+        transaction: Dict[str, Any]
     ) -> Dict[str, Any]:
-        lines = response.strip().split('\n')
         result = {
             "is_anomaly": False,
             "confidence": 0.0,
@@ -138,21 +392,22 @@ EXPLANATION: [Brief explanation]
             "detected_by": "watsonx-llm"
         }
 
-        for line in lines:
-            line = line.strip()
-            if line.startswith("IS_ANOMALY:"):
-                result["is_anomaly"] = "YES" in line.upper()
-            elif line.startswith("CONFIDENCE:"):
-                try:
-                    result["confidence"] = float(line.split(":")[-1].strip())
-                except ValueError:
-                    pass
-            elif line.startswith("ANOMALY_TYPE:"):
-                result["anomaly_type"] = line.split(":")[-1].strip().lower().replace(" ", "_")
-            elif line.startswith("SEVERITY:"):
-                result["severity"] = line.split(":")[-1].strip().lower()
-            elif line.startswith("EXPLANATION:"):
-                result["explanation"] = line.split(":", 1)[-1].strip()
+        is_anomaly = data.get("is_anomaly")
+        if isinstance(is_anomaly, str):
+            result["is_anomaly"] = is_anomaly.strip().upper() in ("YES", "TRUE")
+        elif is_anomaly is not None:
+            result["is_anomaly"] = bool(is_anomaly)
+
+        confidence = _to_float(data.get("confidence"))
+        if confidence is not None:
+            result["confidence"] = confidence
+
+        if data.get("anomaly_type"):
+            result["anomaly_type"] = str(data["anomaly_type"]).strip().lower().replace(" ", "_")
+        if data.get("severity"):
+            result["severity"] = str(data["severity"]).strip().lower()
+        if data.get("explanation"):
+            result["explanation"] = str(data["explanation"]).strip()
 
         return result
 
@@ -171,13 +426,11 @@ Dataset Summary:
 
 Provide a quality score (0-100) and recommendations for improvement.
 
-Format:
-QUALITY_SCORE: [0-100]
-RECOMMENDATIONS: [List of recommendations]
+Respond with ONLY a JSON object with keys: quality_score (number 0-100), recommendations (array of at most 5 strings, each under 15 words).
 """
 
         try:
-            response = await self.generate_text(prompt, max_tokens=500)
+            response = await self.generate_text(prompt, max_tokens=200)
             return self._parse_quality_response(response)
         except Exception as e:
             logger.error(f"Error in quality validation: {e}")
@@ -189,16 +442,19 @@ RECOMMENDATIONS: [List of recommendations]
             "recommendations": []
         }
 
-        lines = response.strip().split('\n')
-        for line in lines:
-            if line.startswith("QUALITY_SCORE:"):
-                try:
-                    result["quality_score"] = float(line.split(":")[-1].strip())
-                except ValueError:
-                    pass
-            elif line.startswith("RECOMMENDATIONS:"):
-                recs = line.split(":", 1)[-1].strip()
-                result["recommendations"] = [r.strip() for r in recs.split(",")]
+        data = _load_json(_JSON_OBJECT, response)
+        if not isinstance(data, dict):
+            return result
+
+        quality_score = _to_float(data.get("quality_score"))
+        if quality_score is not None:
+            result["quality_score"] = quality_score
+
+        recommendations = data.get("recommendations")
+        if isinstance(recommendations, str):
+            recommendations = recommendations.split(",")
+        if isinstance(recommendations, list):
+            result["recommendations"] = [str(r).strip() for r in recommendations]
 
         return result
 
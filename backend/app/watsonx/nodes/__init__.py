@@ -1,4 +1,8 @@
 """Watsonx pipeline nodes."""
+import pandas as pd
+
+pd.set_option("mode.copy_on_write", True)
+
 from app.watsonx.nodes.ingestion_node import IngestionNode
 from app.watsonx.nodes.validation_node import ValidationNode
 from app.watsonx.nodes.cleaning_node import CleaningNode
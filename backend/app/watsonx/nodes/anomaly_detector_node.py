@@ -1,53 +1,70 @@
 """Anomaly Detector Node - Uses ML/LLM to detect inconsistent entries."""
 import pandas as pd
+import numpy as np
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import asyncio
 
 from app.watsonx.client import watsonx_client
+from app.watsonx.nodes.cleaning_node import MISSING_DESCRIPTION
 
 logger = logging.getLogger(__name__)
 
+RULE_ANOMALY_FIELDS = (
+    "row_index", "transaction_id", "anomaly_type", "severity", "confidence",
+    "detected_by", "description", "field_name", "original_value"
+)
+
 
 class AnomalyDetectorNode:
 
-    def __init__(self, confidence_threshold: float = 0.75):
+    def __init__(self, confidence_threshold: float = 0.75, batch_size: int = 16):
         self.node_id = "anomaly_detector_node"
         self.node_name = "Anomaly Detector Node"
         self.confidence_threshold = confidence_threshold
+        self.batch_size = batch_size
 
     async def execute(self, dataframe: pd.DataFrame, **kwargs) -> Dict[str, Any]:
         logger.info(f"Starting anomaly detection for {len(dataframe)} rows")
 
-        df = dataframe.copy()
+        df = dataframe.copy(deep=False)
         anomalies_detected = []
         df['is_anomaly'] = False
 
         rule_based_anomalies = await self._rule_based_detection(df)
         anomalies_detected.extend(rule_based_anomalies)
-
-        sample_size = min(100, len(df))
-        sample_indices = df.sample(n=sample_size, random_state=42).index
-
-        llm_tasks = []
-        for idx in sample_indices:
-            row = df.loc[idx]
-            transaction_data = row.to_dict()
-            llm_tasks.append(self._llm_detection(idx, transaction_data))
-
-        llm_results = await asyncio.gather(*llm_tasks, return_exceptions=True)
-
-        for result in llm_results:
-            if isinstance(result, dict) and result.get('is_anomaly'):
-                anomalies_detected.append(result)
-                idx = result.get('row_index')
-                if idx is not None:
-                    df.at[idx, 'is_anomaly'] = True
-
-        for anomaly in rule_based_anomalies:
-            idx = anomaly.get('row_index')
-            if idx is not None:
-                df.at[idx, 'is_anomaly'] = True
+        df.loc[[anomaly['row_index'] for anomaly in rule_based_anomalies], 'is_anomaly'] = True
+
+        candidates = ~df['is_anomaly']
+        if 'description' in df.columns:
+            description = df['description'].astype(str).str.strip()
+            candidates &= df['description'].notna() & description.ne('') & description.ne(MISSING_DESCRIPTION)
+        candidate_positions = np.flatnonzero(candidates.to_numpy(dtype=bool, na_value=False))
+
+        rng = np.random.default_rng(42)
+        positions = rng.choice(candidate_positions, size=min(100, len(candidate_positions)), replace=False)
+        sample = df.iloc[positions]
+        sample = sample.astype(object).where(sample.notna(), None)
+
+        groups: Dict[str, List[Tuple[Any, Dict[str, Any]]]] = {}
+        for idx, transaction_data in zip(sample.index, sample.to_dict('records')):
+            groups.setdefault(watsonx_client.fingerprint(transaction_data), []).append((idx, transaction_data))
+        unique_groups = list(groups.values())
+
+        llm_tasks = [
+            self._llm_detection_batch(unique_groups[start:start + self.batch_size])
+            for start in range(0, len(unique_groups), self.batch_size)
+        ]
+
+        batch_results = await asyncio.gather(*llm_tasks, return_exceptions=True)
+        llm_results = [
+            result
+            for batch in batch_results if isinstance(batch, list)
+            for result in batch
+        ]
+
+        anomalies_detected.extend(llm_results)
+        df.loc[[result['row_index'] for result in llm_results if result.get('row_index') is not None], 'is_anomaly'] = True
 
         result = {
             "success": True,
@@ -67,102 +84,105 @@ class AnomalyDetectorNode:
         return result
 
     async def _rule_based_detection(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        anomalies = []
-
-        for idx, row in df.iterrows():
-            if (pd.notna(row.get('balance')) and
-                float(row.get('balance', 0)) < 0 and
-                str(row.get('status', '')).lower() == 'completed'):
-                anomalies.append({
-                    "row_index": idx,
-                    "transaction_id": row.get('transaction_id'),
-                    "anomaly_type": "negative_balance",
-                    "severity": "high",
-                    "confidence": 0.95,
-                    "detected_by": "rule-based",
-                    "description": "Negative balance with completed transaction status",
-                    "field_name": "balance",
-                    "original_value": str(row.get('balance'))
-                })
-
-            amount = float(row.get('amount', 0))
-            if amount > 1000000:
-                anomalies.append({
-                    "row_index": idx,
-                    "transaction_id": row.get('transaction_id'),
-                    "anomaly_type": "suspicious_amount",
-                    "severity": "medium",
-                    "confidence": 0.80,
-                    "detected_by": "rule-based",
-                    "description": f"Unusually high transaction amount: ${amount:,.2f}",
-                    "field_name": "amount",
-                    "original_value": str(amount)
-                })
-            elif amount == 0:
-                anomalies.append({
-                    "row_index": idx,
-                    "transaction_id": row.get('transaction_id'),
-                    "anomaly_type": "suspicious_amount",
-                    "severity": "low",
-                    "confidence": 0.70,
-                    "detected_by": "rule-based",
-                    "description": "Zero amount transaction",
-                    "field_name": "amount",
-                    "original_value": "0"
-                })
-
-            if (str(row.get('status', '')).lower() == 'failed' and
-                float(row.get('amount', 0)) > 0 and
-                pd.notna(row.get('balance')) and
-                float(row.get('balance', 0)) != float(row.get('amount', 0))):
-                anomalies.append({
-                    "row_index": idx,
-                    "transaction_id": row.get('transaction_id'),
-                    "anomaly_type": "status_mismatch",
-                    "severity": "high",
-                    "confidence": 0.90,
-                    "detected_by": "rule-based",
-                    "description": "Failed transaction with balance change",
-                    "field_name": "status",
-                    "original_value": str(row.get('status'))
-                })
-
-            if hasattr(row, 'is_duplicate') and row.is_duplicate:
-                anomalies.append({
-                    "row_index": idx,
-                    "transaction_id": row.get('transaction_id'),
-                    "anomaly_type": "duplicate_transaction",
-                    "severity": "medium",
-                    "confidence": 1.0,
-                    "detected_by": "rule-based",
-                    "description": "Duplicate transaction ID found",
-                    "field_name": "transaction_id",
-                    "original_value": str(row.get('transaction_id'))
-                })
-
-            required_fields = ['transaction_id', 'customer_id', 'amount', 'status']
-            missing_fields = [f for f in required_fields if pd.isna(row.get(f))]
-            if missing_fields:
-                anomalies.append({
-                    "row_index": idx,
-                    "transaction_id": row.get('transaction_id'),
-                    "anomaly_type": "missing_required_field",
-                    "severity": "critical",
-                    "confidence": 1.0,
-                    "detected_by": "rule-based",
-                    "description": f"Missing required fields: {', '.join(missing_fields)}",
-                    "field_name": "multiple",
-                    "original_value": str(missing_fields)
-                })
-
-        return anomalies
-
-    async def _llm_detection(self, idx: int, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+        n = len(df)
+        row_index = df.index.tolist()
+        if 'transaction_id' in df:
+            transaction_ids = df['transaction_id'].astype(object).where(df['transaction_id'].notna(), np.nan).tolist()
+        else:
+            transaction_ids = [None] * n
+        status_raw = df['status'] if 'status' in df else pd.Series('', index=df.index)
+        if isinstance(status_raw.dtype, pd.CategoricalDtype):
+            status = status_raw.map(lambda value: str(value).lower())
+        else:
+            status = status_raw.astype(str).str.lower()
+        amount = pd.to_numeric(df['amount'], errors='coerce') if 'amount' in df else pd.Series(0.0, index=df.index)
+        balance = pd.to_numeric(df['balance'], errors='coerce') if 'balance' in df else pd.Series(np.nan, index=df.index)
+
+        amounts = amount.tolist()
+        balances = df['balance'].tolist() if 'balance' in df else [None] * n
+        statuses = status_raw.tolist()
+
+        required_fields = ['transaction_id', 'customer_id', 'amount', 'status']
+        missing = np.column_stack([
+            df[f].isna().to_numpy() if f in df else np.ones(n, dtype=bool)
+            for f in required_fields
+        ]) if n else np.zeros((0, len(required_fields)), dtype=bool)
+
+        keyed = []
+
+        def collect(mask, rank, anomaly_type, severity, confidence, field_name, describe, original_value):
+            keyed.extend(
+                (pos, rank, (
+                    row_index[pos], transaction_ids[pos], anomaly_type, severity, confidence,
+                    "rule-based", describe(pos), field_name, original_value(pos)
+                ))
+                for pos in np.flatnonzero(mask)
+            )
+
+        collect(
+            (balance.lt(0) & status.eq('completed')).to_numpy(),
+            0, "negative_balance", "high", 0.95, "balance",
+            lambda pos: "Negative balance with completed transaction status",
+            lambda pos: str(balances[pos])
+        )
+
+        collect(
+            amount.gt(1000000).to_numpy(),
+            1, "suspicious_amount", "medium", 0.80, "amount",
+            lambda pos: f"Unusually high transaction amount: ${amounts[pos]:,.2f}",
+            lambda pos: str(amounts[pos])
+        )
+        collect(
+            amount.eq(0).to_numpy(),
+            1, "suspicious_amount", "low", 0.70, "amount",
+            lambda pos: "Zero amount transaction",
+            lambda pos: "0"
+        )
+
+        collect(
+            (status.eq('failed') & amount.gt(0) & balance.notna() & balance.ne(amount)).to_numpy(),
+            2, "status_mismatch", "high", 0.90, "status",
+            lambda pos: "Failed transaction with balance change",
+            lambda pos: str(statuses[pos])
+        )
+
+        if 'is_duplicate' in df:
+            collect(
+                df['is_duplicate'].astype(bool).to_numpy(),
+                3, "duplicate_transaction", "medium", 1.0, "transaction_id",
+                lambda pos: "Duplicate transaction ID found",
+                lambda pos: str(transaction_ids[pos])
+            )
+
+        def missing_fields(pos):
+            return [f for f, is_missing in zip(required_fields, missing[pos]) if is_missing]
+
+        collect(
+            missing.any(axis=1),
+            4, "missing_required_field", "critical", 1.0, "multiple",
+            lambda pos: f"Missing required fields: {', '.join(missing_fields(pos))}",
+            lambda pos: str(missing_fields(pos))
+        )
+
+        keyed.sort(key=lambda item: (item[0], item[1]))
+        return [dict(zip(RULE_ANOMALY_FIELDS, record)) for _, _, record in keyed]
+
+    async def _llm_detection_batch(
+        self,
+        groups: List[List[Tuple[Any, Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
         try:
-            result = await watsonx_client.detect_anomaly(transaction_data)
+            results = await watsonx_client.detect_anomalies_batch([members[0][1] for members in groups])
+        except Exception as e:
+            logger.error(f"LLM detection failed for rows {[members[0][0] for members in groups]}: {e}")
+            return []
 
-            if result.get('is_anomaly') and result.get('confidence', 0) >= self.confidence_threshold:
-                return {
+        anomalies = []
+        for members, result in zip(groups, results):
+            if not (result.get('is_anomaly') and result.get('confidence', 0) >= self.confidence_threshold):
+                continue
+            for idx, transaction_data in members:
+                anomalies.append({
                     "row_index": idx,
                     "transaction_id": transaction_data.get('transaction_id'),
                     "anomaly_type": result.get('anomaly_type', 'semantic_inconsistency'),
@@ -172,12 +192,8 @@ class AnomalyDetectorNode:
                     "description": result.get('explanation', 'Semantic inconsistency detected'),
                     "llm_explanation": result.get('explanation'),
                     "context": transaction_data
-                }
-            return {}
-
-        except Exception as e:
-            logger.error(f"LLM detection failed for row {idx}: {e}")
-            return {}
+                })
+        return anomalies
 
     def get_node_config(self) -> Dict[str, Any]:
         return {
@@ -186,7 +202,8 @@ class AnomalyDetectorNode:
             "node_type": "anomaly_detection",
             "inputs": {
                 "dataframe": {"type": "pandas.DataFrame", "required": True},
-                "confidence_threshold": {"type": "float", "default": 0.75}
+                "confidence_threshold": {"type": "float", "default": 0.75},
+                "batch_size": {"type": "int", "default": 16}
             },
             "outputs": {
                 "dataframe": {"type": "pandas.DataFrame"},
@@ -1,6 +1,7 @@
 """Cleaning Node - Performs imputations, normalization, regex transformations."""
 import pandas as pd
 import numpy as np
+import asyncio
 import logging
 from typing import Dict, Any, List
 from datetime import datetime
@@ -8,6 +9,67 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# ASCII-only class kept uncompiled so Arrow strings use the pyarrow regex kernel.
+_ID_STRIP = r'[^a-zA-Z0-9_-]'
+_CURRENCY = re.compile(r'[$€£¥,]')
+_PARENS = re.compile(r'^\((.*)\)$')
+_WS = re.compile(r'\s+')
+_DESC_STRIP = re.compile(r'[^\w\s\-.,!?()]')
+_DESC_NEEDS_CLEAN = r'^\s|\s$|[^\S ]|\s{2}|[^\w\s\-.,!?()]'
+
+MISSING_DESCRIPTION = 'No description'
+
+# Cast to string[pyarrow] on entry. The ID, status and type string ops and the description check run
+# on Arrow; only descriptions flagged as dirty are cleaned as object strings (see _clean_description).
+STRING_COLUMNS = ('transaction_id', 'customer_id', 'status', 'transaction_type', 'description', 'currency')
+
+CATEGORICAL_COLUMNS = ('status', 'transaction_type', 'currency')
+
+STATUS_MAP = {
+    'complete': 'completed',
+    'success': 'completed',
+    'successful': 'completed',
+    'approved': 'completed',
+    'done': 'completed',
+    'fail': 'failed',
+    'failure': 'failed',
+    'declined': 'failed',
+    'rejected': 'failed',
+    'cancel': 'cancelled',
+    'canceled': 'cancelled',
+    'process': 'processing',
+    'processing': 'processing',
+    'pend': 'pending',
+    'waiting': 'pending'
+}
+
+TYPE_MAP = {
+    'dep': 'deposit',
+    'credit': 'deposit',
+    'withdraw': 'withdrawal',
+    'withdrawal': 'withdrawal',
+    'debit': 'withdrawal',
+    'transfer': 'transfer',
+    'xfer': 'transfer',
+    'payment': 'payment',
+    'pay': 'payment',
+    'purchase': 'payment',
+    'refund': 'refund',
+    'return': 'refund'
+}
+
+CANONICAL_CATEGORIES = {
+    'status': ['completed', 'pending', 'failed', 'cancelled', 'processing'],
+    'transaction_type': ['deposit', 'withdrawal', 'transfer', 'payment', 'refund', 'unknown'],
+    'currency': ['USD']
+}
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    if isinstance(values.dtype, pd.StringDtype):
+        return values
+    return values.astype(str)
+
 
 class CleaningNode:
 
@@ -16,88 +78,87 @@ class CleaningNode:
         self.node_name = "Data Cleaning Node"
 
     async def execute(self, dataframe: pd.DataFrame, **kwargs) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._execute_sync, dataframe)
+
+    def _execute_sync(self, dataframe: pd.DataFrame) -> Dict[str, Any]:
         logger.info(f"Starting cleaning for {len(dataframe)} rows")
 
-        df = dataframe.copy()
-        cleaning_log = []
-        rows_modified = 0
-
-        df['original_values'] = df.apply(lambda row: {}, axis=1)
-        df['cleaning_actions'] = df.apply(lambda row: [], axis=1)
-        df['was_cleaned'] = False
-
-        for idx, row in df.iterrows():
-            row_modified = False
-            original_values = {}
-            actions = []
-
-            if pd.notna(row.get('transaction_id')):
-                cleaned_txn_id = self._clean_transaction_id(row['transaction_id'])
-                if cleaned_txn_id != row['transaction_id']:
-                    original_values['transaction_id'] = row['transaction_id']
-                    df.at[idx, 'transaction_id'] = cleaned_txn_id
-                    actions.append("Cleaned transaction_id format")
-                    row_modified = True
-
-            if pd.notna(row.get('amount')):
-                cleaned_amount = self._clean_amount(row['amount'])
-                if cleaned_amount != row['amount']:
-                    original_values['amount'] = row['amount']
-                    df.at[idx, 'amount'] = cleaned_amount
-                    actions.append("Normalized amount value")
-                    row_modified = True
-
-            if pd.notna(row.get('status')):
-                cleaned_status = self._clean_status(row['status'])
-                if cleaned_status != row['status']:
-                    original_values['status'] = row['status']
-                    df.at[idx, 'status'] = cleaned_status
-                    actions.append("Standardized status value")
-                    row_modified = True
-
-            if pd.notna(row.get('transaction_type')):
-                cleaned_type = self._clean_transaction_type(row['transaction_type'])
-                if cleaned_type != row['transaction_type']:
-                    original_values['transaction_type'] = row['transaction_type']
-                    df.at[idx, 'transaction_type'] = cleaned_type
-                    actions.append("Standardized transaction_type")
-                    row_modified = True
-
-            if pd.notna(row.get('description')):
-                cleaned_desc = self._clean_description(row['description'])
-                if cleaned_desc != row['description']:
-                    original_values['description'] = row['description']
-                    df.at[idx, 'description'] = cleaned_desc
-                    actions.append("Cleaned description text")
-                    row_modified = True
-
-            if pd.isna(row.get('currency')):
-                df.at[idx, 'currency'] = 'USD'
-                actions.append("Imputed missing currency with USD")
-                row_modified = True
-
-            if pd.notna(row.get('customer_id')):
-                cleaned_cust_id = self._clean_customer_id(row['customer_id'])
-                if cleaned_cust_id != row['customer_id']:
-                    original_values['customer_id'] = row['customer_id']
-                    df.at[idx, 'customer_id'] = cleaned_cust_id
-                    actions.append("Cleaned customer_id format")
-                    row_modified = True
-
-            if row_modified:
-                df.at[idx, 'original_values'] = original_values
-                df.at[idx, 'cleaning_actions'] = actions
-                df.at[idx, 'was_cleaned'] = True
-                rows_modified += 1
-                cleaning_log.append({
-                    "row_index": idx,
-                    "actions": actions,
-                    "original_values": original_values
-                })
+        df = dataframe.astype({
+            column: 'string[pyarrow]' for column in STRING_COLUMNS if column in dataframe.columns
+        })
+
+        n = len(df)
+        row_index = df.index.tolist()
+        no_change = np.zeros(n, dtype=bool)
+
+        checks = []
+        cleaned_columns = {}
+        originals = {}
+        for column, cleaner, action in (
+            ('transaction_id', self._clean_transaction_id, "Cleaned transaction_id format"),
+            ('amount', self._clean_amount, "Normalized amount value"),
+            ('status', self._clean_status, "Standardized status value"),
+            ('transaction_type', self._clean_transaction_type, "Standardized transaction_type"),
+            ('description', self._clean_description, "Cleaned description text"),
+            ('currency', None, "Imputed missing currency with USD"),
+            ('customer_id', self._clean_customer_id, "Cleaned customer_id format"),
+        ):
+            if column == 'currency':
+                if column in df.columns:
+                    changed = df[column].isna()
+                    cleaned_columns[column] = df[column].mask(changed, 'USD')
+                else:
+                    changed = pd.Series(True, index=df.index)
+                    cleaned_columns[column] = 'USD'
+                checks.append((column, action, changed.to_numpy()))
+                continue
+
+            if column not in df.columns:
+                checks.append((column, action, no_change))
+                continue
+
+            original = df[column]
+            cleaned = cleaner(original)
+            changed = (original.notna() & cleaned.ne(original)).to_numpy(dtype=bool, na_value=False)
+            checks.append((column, action, changed))
+            originals[column] = original
+            if changed.any():
+                cleaned_columns[column] = original.mask(changed, cleaned)
+
+        modified = np.logical_or.reduce([changed for _, _, changed in checks])
+        original_values_col = [{} for _ in range(n)]
+        cleaning_actions_col = [[] for _ in range(n)]
+
+        for column, action, changed in checks:
+            positions = np.flatnonzero(changed)
+            for pos in positions:
+                cleaning_actions_col[pos].append(action)
+            if column in originals:
+                for pos, value in zip(positions, originals[column].iloc[positions].tolist()):
+                    original_values_col[pos][column] = value
+
+        cleaning_log = [
+            {
+                "row_index": row_index[pos],
+                "actions": cleaning_actions_col[pos],
+                "original_values": original_values_col[pos]
+            }
+            for pos in np.flatnonzero(modified)[:100]
+        ]
+
+        df = df.assign(
+            **cleaned_columns,
+            original_values=original_values_col,
+            cleaning_actions=cleaning_actions_col,
+            was_cleaned=modified
+        )
+        rows_modified = int(modified.sum())
+        cleaning_actions_count = int(sum(changed.sum() for _, _, changed in checks))
 
         df = self._handle_duplicates(df)
         df = self._handle_missing_values(df)
         df = self._normalize_dates(df)
+        df = self._categorize(df)
 
         result = {
             "success": True,
@@ -107,133 +168,93 @@ class CleaningNode:
                 "total_rows": len(df),
                 "rows_modified": rows_modified,
                 "modification_rate": round(rows_modified / len(df) * 100, 2) if len(df) > 0 else 0,
-                "cleaning_actions_count": sum(len(log['actions']) for log in cleaning_log)
+                "cleaning_actions_count": cleaning_actions_count
             },
-            "cleaning_log": cleaning_log[:100]
+            "cleaning_log": cleaning_log
         }
 
         logger.info(f"Cleaning complete: {rows_modified} rows modified")
         return result
 
-    def _clean_transaction_id(self, value: Any) -> str:
-        if pd.isna(value):
-            return ""
-
-        txn_id = str(value).strip()
-
-        txn_id = re.sub(r'[^a-zA-Z0-9_-]', '', txn_id)
-
-        return txn_id.upper()
-
-    def _clean_customer_id(self, value: Any) -> str:
-        if pd.isna(value):
-            return ""
-
-        cust_id = str(value).strip()
-        cust_id = re.sub(r'[^a-zA-Z0-9_-]', '', cust_id)
-        return cust_id.upper()
-
-    def _clean_amount(self, value: Any) -> float:
-        if pd.isna(value):
-            return 0.0
-
-        if isinstance(value, str):
-            value = re.sub(r'[$€£¥,]', '', value.strip())
-
-            if value.startswith('(') and value.endswith(')'):
-                value = '-' + value[1:-1]
-
-        try:
-            amount = float(value)
-            return round(amount, 2)
-        except (ValueError, TypeError):
-            return 0.0
-
-    def _clean_status(self, value: Any) -> str:
-        if pd.isna(value):
-            return "unknown"
-
-        status = str(value).lower().strip()
-
-        status_map = {
-            'complete': 'completed',
-            'success': 'completed',
-            'successful': 'completed',
-            'approved': 'completed',
-            'done': 'completed',
-            'fail': 'failed',
-            'failure': 'failed',
-            'declined': 'failed',
-            'rejected': 'failed',
-            'cancel': 'cancelled',
-            'canceled': 'cancelled',
-            'process': 'processing',
-            'processing': 'processing',
-            'pend': 'pending',
-            'waiting': 'pending'
-        }
+    def _clean_transaction_id(self, values: pd.Series) -> pd.Series:
+        return _as_text(values).str.strip().str.replace(_ID_STRIP, '', regex=True).str.upper()
 
-        return status_map.get(status, status)
-
-    def _clean_transaction_type(self, value: Any) -> str:
-        if pd.isna(value):
-            return "unknown"
-
-        trans_type = str(value).lower().strip()
-
-        type_map = {
-            'dep': 'deposit',
-            'credit': 'deposit',
-            'withdraw': 'withdrawal',
-            'withdrawal': 'withdrawal',
-            'debit': 'withdrawal',
-            'transfer': 'transfer',
-            'xfer': 'transfer',
-            'payment': 'payment',
-            'pay': 'payment',
-            'purchase': 'payment',
-            'refund': 'refund',
-            'return': 'refund'
-        }
+    def _clean_customer_id(self, values: pd.Series) -> pd.Series:
+        return _as_text(values).str.strip().str.replace(_ID_STRIP, '', regex=True).str.upper()
 
-        return type_map.get(trans_type, trans_type)
+    def _clean_amount(self, values: pd.Series) -> pd.Series:
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            return values.astype(float).round(2)
 
-    def _clean_description(self, value: Any) -> str:
-        if pd.isna(value):
-            return ""
+        text = values.astype(str).str.strip().str.replace(_CURRENCY, '', regex=True)
+        text = text.str.replace(_PARENS, r'-\1', regex=True)
 
-        desc = str(value).strip()
+        return pd.to_numeric(text, errors='coerce').fillna(0.0).round(2)
 
-        desc = re.sub(r'\s+', ' ', desc)
+    def _clean_status(self, values: pd.Series) -> pd.Series:
+        status = _as_text(values).str.lower().str.strip()
+        mapped = status.map(STATUS_MAP)
+        return mapped.where(mapped.notna(), status)
 
-        desc = re.sub(r'[^\w\s\-.,!?()]', '', desc)
+    def _clean_transaction_type(self, values: pd.Series) -> pd.Series:
+        trans_type = _as_text(values).str.lower().str.strip()
+        mapped = trans_type.map(TYPE_MAP)
+        return mapped.where(mapped.notna(), trans_type)
 
-        return desc
+    def _clean_description(self, values: pd.Series) -> pd.Series:
+        desc = _as_text(values)
+        needs_cleaning = desc.str.contains(_DESC_NEEDS_CLEAN, regex=True, na=False).to_numpy(dtype=bool)
+        if not needs_cleaning.any():
+            return desc
+
+        # _WS and _DESC_STRIP rely on Python's Unicode \s and \w, which the Arrow regex kernel
+        # doesn't match, so the flagged subset is cleaned as object strings and written back.
+        dirty = desc[needs_cleaning].astype(object).str.strip()
+        dirty = dirty.str.replace(_WS, ' ', regex=True)
+        cleaned = desc.copy()
+        cleaned[needs_cleaning] = dirty.str.replace(_DESC_STRIP, '', regex=True).to_numpy()
+        return cleaned
 
     def _handle_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
-        duplicates = df[df.duplicated(subset=['transaction_id'], keep='first')]
+        duplicated = df['transaction_id'].duplicated(keep='first')
+        duplicate_count = int(duplicated.sum())
 
-        if len(duplicates) > 0:
-            logger.warning(f"Found {len(duplicates)} duplicate transaction IDs")
-            df['is_duplicate'] = df.duplicated(subset=['transaction_id'], keep='first')
+        if duplicate_count > 0:
+            logger.warning(f"Found {duplicate_count} duplicate transaction IDs")
+            df['is_duplicate'] = duplicated
 
         return df
 
     def _handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
         if 'description' in df.columns:
-            df['description'].fillna('No description', inplace=True)
+            df['description'] = df['description'].fillna(MISSING_DESCRIPTION)
 
         if 'transaction_type' in df.columns:
-            df['transaction_type'].fillna('unknown', inplace=True)
+            df['transaction_type'] = df['transaction_type'].fillna('unknown')
 
         if 'balance' in df.columns:
-            df['balance'].fillna(method='ffill', inplace=True)
+            df['balance'] = df['balance'].ffill()
+
+        return df
+
+    def _categorize(self, df: pd.DataFrame) -> pd.DataFrame:
+        for column in CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                canonical = CANONICAL_CATEGORIES[column]
+                observed = df[column].dropna().unique()
+                categories = canonical + sorted(set(observed) - set(canonical))
+                df[column] = pd.Categorical(df[column], categories=categories)
 
         return df
 
     def _normalize_dates(self, df: pd.DataFrame) -> pd.DataFrame:
-        if 'transaction_date' in df.columns:
-            df['transaction_date'] = pd.to_datetime(df['transaction_date'], errors='coerce')
+        if 'transaction_date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['transaction_date']):
+            raw = df['transaction_date']
+            parsed = pd.to_datetime(raw, format='ISO8601', errors='coerce')
+            leftover = parsed.isna() & raw.notna()
+            if leftover.any():
+                parsed[leftover] = pd.to_datetime(raw[leftover], errors='coerce')
+            df['transaction_date'] = parsed
 
         return df
 
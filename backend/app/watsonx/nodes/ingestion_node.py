@@ -1,5 +1,6 @@
 """Data Ingestion Node - Converts raw sources to standardized dataframe."""
 import pandas as pd
+import asyncio
 import logging
 from typing import Dict, Any, Optional
 from pathlib import Path
@@ -46,7 +47,7 @@ class IngestionNode:
                 "metadata": {
                     "shape": df.shape,
                     "dtypes": df.dtypes.astype(str).to_dict(),
-                    "memory_usage": df.memory_usage(deep=True).sum()
+                    "memory_usage": int(df.memory_usage(deep=True).sum())
                 }
             }
 
@@ -69,15 +70,9 @@ class IngestionNode:
 
         for encoding in encodings:
             try:
-                df = pd.read_csv(
-                    file_path,
-                    encoding=encoding,
-                    parse_dates=['date', 'transaction_date'],
-                    infer_datetime_format=True,
-                    low_memory=False
-                )
+                df = self._read_csv(file_path, encoding)
                 logger.info(f"Successfully read CSV with {encoding} encoding")
-                return df
+                return self._parse_dates(df)
             except UnicodeDecodeError:
                 continue
             except Exception as e:
@@ -87,6 +82,35 @@ class IngestionNode:
 
         raise ValueError(f"Could not read CSV file with any supported encoding")
 
+    def _read_csv(self, file_path: str, encoding: str) -> pd.DataFrame:
+        try:
+            df = pd.read_csv(file_path, encoding=encoding, engine='pyarrow')
+            if not self._has_binary_columns(df):
+                return df
+            logger.info(f"pyarrow CSV reader found bytes that are not valid {encoding}, retrying with the C parser")
+        except Exception as e:
+            logger.info(f"pyarrow CSV reader failed ({e}), retrying with the C parser")
+
+        return pd.read_csv(file_path, encoding=encoding, low_memory=False)
+
+    def _has_binary_columns(self, df: pd.DataFrame) -> bool:
+        for column in df.columns[df.dtypes == object]:
+            first = df[column].first_valid_index()
+            if first is not None and isinstance(df[column].loc[first], bytes):
+                return True
+        return False
+
+    def _parse_dates(self, df: pd.DataFrame) -> pd.DataFrame:
+        for column in ('date', 'transaction_date'):
+            if column in df.columns and pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = df[column].dt.as_unit('ns')
+            elif column in df.columns and df[column].dtype == object:
+                try:
+                    df[column] = pd.to_datetime(df[column], format='ISO8601')
+                except (ValueError, TypeError):
+                    logger.info(f"Column {column} is not uniformly ISO 8601, leaving it for cleaning")
+        return df
+
     async def _ingest_sql(self, connection_string: str, query: Optional[str] = None) -> pd.DataFrame:
         logger.info("Reading from SQL database")
 
@@ -97,7 +121,10 @@ class IngestionNode:
         if not query:
             query = "SELECT * FROM transactions"
 
-        df = pd.read_sql(query, engine)
+        try:
+            df = await asyncio.to_thread(pd.read_sql, query, engine)
+        finally:
+            engine.dispose()
         logger.info(f"Read {len(df)} rows from database")
 
         return df
@@ -1,12 +1,19 @@
 """Schema Validator Node - Enforces banking schema rules."""
 import pandas as pd
+import numpy as np
+import asyncio
 import logging
+import orjson
 from typing import Dict, Any, List
-from datetime import datetime
 import re
 
 logger = logging.getLogger(__name__)
 
+VALID_STATUSES = frozenset({
+    'completed', 'pending', 'failed', 'cancelled',
+    'success', 'approved', 'declined', 'processing'
+})
+
 
 class ValidationNode:
 
@@ -22,9 +29,12 @@ class ValidationNode:
         ]
 
     async def execute(self, dataframe: pd.DataFrame, **kwargs) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._execute_sync, dataframe)
+
+    def _execute_sync(self, dataframe: pd.DataFrame) -> Dict[str, Any]:
         logger.info(f"Starting validation for {len(dataframe)} rows")
 
-        df = dataframe.copy()
+        df = dataframe
         validation_errors = []
         rows_with_errors = []
 
@@ -37,56 +47,41 @@ class ValidationNode:
                 "dataframe": df
             }
 
-        for idx, row in df.iterrows():
-            row_errors = []
-
-            if not self._validate_transaction_id(row.get('transaction_id')):
-                row_errors.append({
-                    "field": "transaction_id",
-                    "error": "Invalid or missing transaction ID",
-                    "value": row.get('transaction_id')
-                })
-
-            if not self._validate_customer_id(row.get('customer_id')):
-                row_errors.append({
-                    "field": "customer_id",
-                    "error": "Invalid or missing customer ID",
-                    "value": row.get('customer_id')
-                })
-
-            amount_error = self._validate_amount(row.get('amount'))
-            if amount_error:
-                row_errors.append({
-                    "field": "amount",
-                    "error": amount_error,
-                    "value": row.get('amount')
-                })
-
-            date_error = self._validate_date(row.get('transaction_date'))
-            if date_error:
-                row_errors.append({
-                    "field": "transaction_date",
-                    "error": date_error,
-                    "value": row.get('transaction_date')
-                })
-
-            if not self._validate_status(row.get('status')):
-                row_errors.append({
-                    "field": "status",
-                    "error": "Invalid or missing status",
-                    "value": row.get('status')
-                })
-
-            if row_errors:
+        n = len(df)
+        row_error_text = np.full(n, np.nan, dtype=object)
+
+        fields = ['transaction_id', 'customer_id', 'amount', 'transaction_date', 'status']
+        selected = df.reindex(columns=fields)
+        error_matrix = np.column_stack([
+            np.where(self._validate_ids(selected['transaction_id']), "", "Invalid or missing transaction ID"),
+            np.where(self._validate_ids(selected['customer_id']), "", "Invalid or missing customer ID"),
+            self._validate_amounts(selected['amount']),
+            self._validate_dates(selected['transaction_date']),
+            np.where(self._validate_statuses(selected['status']), "", "Invalid or missing status"),
+        ]).astype(object)
+        has_error = error_matrix != ""
+        is_valid = ~has_error.any(axis=1)
+        invalid_positions = np.flatnonzero(~is_valid)
+
+        rows = selected.iloc[invalid_positions].itertuples(index=True, name=None)
+        for pos, (idx, *values) in zip(invalid_positions, rows):
+            row_errors = [
+                {"field": field, "error": error, "value": value}
+                for field, error, value in zip(fields, error_matrix[pos], values) if error
+            ]
+
+            if len(validation_errors) < 100:
                 validation_errors.extend(row_errors)
+            if len(rows_with_errors) < 100:
                 rows_with_errors.append(idx)
-                df.at[idx, 'is_valid'] = False
-                df.at[idx, 'validation_errors'] = str(row_errors)
-            else:
-                df.at[idx, 'is_valid'] = True
+            row_error_text[pos] = orjson.dumps(row_errors, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+        df = df.assign(is_valid=is_valid, validation_errors=row_error_text)
+        invalid_rows = len(invalid_positions)
+        error_count = int(has_error.sum())
 
         total_rows = len(df)
-        valid_rows = total_rows - len(rows_with_errors)
+        valid_rows = total_rows - invalid_rows
         validation_rate = (valid_rows / total_rows * 100) if total_rows > 0 else 0
 
         result = {
@@ -96,9 +91,9 @@ class ValidationNode:
             "metrics": {
                 "total_rows": total_rows,
                 "valid_rows": valid_rows,
-                "invalid_rows": len(rows_with_errors),
+                "invalid_rows": invalid_rows,
                 "validation_rate": round(validation_rate, 2),
-                "error_count": len(validation_errors)
+                "error_count": error_count
             },
             "validation_errors": validation_errors[:100],
             "rows_with_errors": rows_with_errors[:100]
@@ -111,19 +106,25 @@ class ValidationNode:
         missing = [col for col in self.required_columns if col not in df.columns]
         return missing
 
-    def _validate_transaction_id(self, value: Any) -> bool:
-        if pd.isna(value):
-            return False
-        if not isinstance(value, str):
-            value = str(value)
-        return len(value) > 0
+    def _check_values(self, values: pd.Series, check) -> np.ndarray:
+        codes, uniques = pd.factorize(values)
+        results = np.array([check(value) for value in uniques] + [check(None)], dtype=object)
+        return results[codes]
 
-    def _validate_customer_id(self, value: Any) -> bool:
-        if pd.isna(value):
-            return False
-        if not isinstance(value, str):
-            value = str(value)
-        return len(value) > 0
+    def _validate_ids(self, values: pd.Series) -> np.ndarray:
+        return (values.notna() & values.ne('')).to_numpy(dtype=bool, na_value=False)
+
+    def _validate_amounts(self, values: pd.Series) -> np.ndarray:
+        amounts = pd.to_numeric(values, errors='coerce')
+
+        errors = np.full(len(values), "", dtype=object)
+        errors[amounts.eq(0).to_numpy(dtype=bool, na_value=False)] = "Amount is zero"
+        errors[values.isna().to_numpy()] = "Amount is missing"
+
+        unparsed = (amounts.isna() & values.notna()).to_numpy()
+        if unparsed.any():
+            errors[unparsed] = self._check_values(values[unparsed], self._validate_amount)
+        return errors
 
     def _validate_amount(self, value: Any) -> str:
         if pd.isna(value):
@@ -137,40 +138,34 @@ class ValidationNode:
         except (ValueError, TypeError):
             return "Amount is not a valid number"
 
-    def _validate_date(self, value: Any) -> str:
-        if pd.isna(value):
-            return "Date is missing"
-
-        if isinstance(value, (datetime, pd.Timestamp)):
-            now = datetime.now()
-            if value > now:
-                return "Date is in the future"
-            if (now - value).days > 3650:
-                return "Date is more than 10 years old"
-            return ""
-
-        try:
-            date = pd.to_datetime(value)
-            now = datetime.now()
-            if date > now:
-                return "Date is in the future"
-            if (now - date).days > 3650:
-                return "Date is more than 10 years old"
-            return ""
-        except (ValueError, TypeError):
-            return "Invalid date format"
+    def _validate_dates(self, values: pd.Series) -> np.ndarray:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            dates = values
+        else:
+            dates = pd.to_datetime(values, format='mixed', errors='coerce')
+
+        now = pd.Timestamp.now()
+        stamps = dates.to_numpy()
+        errors = np.full(len(values), "", dtype=object)
+        errors[stamps <= (now - pd.Timedelta(days=3651)).to_datetime64()] = "Date is more than 10 years old"
+        errors[stamps > now.to_datetime64()] = "Date is in the future"
+        errors[(dates.isna() & values.notna()).to_numpy()] = "Invalid date format"
+        errors[values.isna().to_numpy()] = "Date is missing"
+        return errors
+
+    def _validate_statuses(self, values: pd.Series) -> np.ndarray:
+        if not pd.api.types.is_string_dtype(values):
+            return self._check_values(values, self._validate_status).astype(bool)
+        statuses = values.astype('category')
+        valid = [str(category).lower() in VALID_STATUSES for category in statuses.cat.categories]
+        return np.array(valid + [False], dtype=bool)[statuses.cat.codes.to_numpy()]
 
     def _validate_status(self, value: Any) -> bool:
         if pd.isna(value):
             return False
 
-        valid_statuses = [
-            'completed', 'pending', 'failed', 'cancelled',
-            'success', 'approved', 'declined', 'processing'
-        ]
-
         if isinstance(value, str):
-            return value.lower() in valid_statuses
+            return value.lower() in VALID_STATUSES
 
         return False
 
@@ -1,4 +1,5 @@
 """Main pipeline orchestrator for Watsonx nodes."""
+import asyncio
 import logging
 from typing import Dict, Any, Optional
 import uuid
@@ -13,15 +14,18 @@ from app.watsonx.nodes.anomaly_detector_node import AnomalyDetectorNode
 logger = logging.getLogger(__name__)
 
 
+_NODES = {
+    "ingestion": IngestionNode(),
+    "validation": ValidationNode(),
+    "cleaning": CleaningNode(),
+    "anomaly_detection": AnomalyDetectorNode()
+}
+
+
 class DataPipeline:
     def __init__(self):
         self.pipeline_id = str(uuid.uuid4())
-        self.nodes = {
-            "ingestion": IngestionNode(),
-            "validation": ValidationNode(),
-            "cleaning": CleaningNode(),
-            "anomaly_detection": AnomalyDetectorNode()
-        }
+        self.nodes = _NODES
 
     async def execute_full_pipeline(
         self,
@@ -65,11 +69,20 @@ class DataPipeline:
                 "metrics": ingestion_result.get("metadata", {})
             }
 
-            dataframe = ingestion_result["dataframe"]
+            dataframe = ingestion_result.pop("dataframe")
             logger.info(f"Ingestion complete: {len(dataframe)} rows")
 
             logger.info("Stage 2: Schema Validation")
-            validation_result = await self.nodes["validation"].execute(dataframe=dataframe)
+            if self.nodes["validation"]._check_required_columns(dataframe):
+                # Report the schema failure instead of letting cleaning trip over the missing columns.
+                validation_result = await self.nodes["validation"].execute(dataframe=dataframe)
+                cleaning_result = None
+            else:
+                logger.info("Stage 3: Data Cleaning")
+                validation_result, cleaning_result = await asyncio.gather(
+                    self.nodes["validation"].execute(dataframe=dataframe),
+                    self.nodes["cleaning"].execute(dataframe=dataframe)
+                )
 
             if not validation_result.get("success"):
                 pipeline_results["status"] = "failed"
@@ -84,12 +97,9 @@ class DataPipeline:
                 "metrics": validation_result.get("metrics", {})
             }
 
-            dataframe = validation_result["dataframe"]
+            validated = validation_result.pop("dataframe")
             logger.info(f"Validation complete: {validation_result['metrics']['valid_rows']} valid rows")
 
-            logger.info("Stage 3: Data Cleaning")
-            cleaning_result = await self.nodes["cleaning"].execute(dataframe=dataframe)
-
             if not cleaning_result.get("success"):
                 pipeline_results["status"] = "failed"
                 pipeline_results["errors"].append({
@@ -103,7 +113,17 @@ class DataPipeline:
                 "metrics": cleaning_result.get("metrics", {})
             }
 
-            dataframe = cleaning_result["dataframe"]
+            position = len(dataframe.columns)
+            dataframe = cleaning_result.pop("dataframe")
+            if len(dataframe) != len(validated) or not dataframe.index.equals(validated.index):
+                raise ValueError("Validation and cleaning returned frames with different rows")
+            for column in ("is_valid", "validation_errors"):
+                if column in dataframe.columns:
+                    dataframe[column] = validated[column].to_numpy()
+                else:
+                    dataframe.insert(position, column, validated[column].to_numpy())
+                    position += 1
+            del validated
             logger.info(f"Cleaning complete: {cleaning_result['metrics']['rows_modified']} rows modified")
 
             logger.info("Stage 4: Anomaly Detection")
@@ -123,7 +143,7 @@ class DataPipeline:
                 "anomalies": anomaly_result.get("anomalies", [])
             }
 
-            dataframe = anomaly_result["dataframe"]
+            dataframe = anomaly_result.pop("dataframe")
             logger.info(f"Anomaly detection complete: {len(anomaly_result.get('anomalies', []))} anomalies found")
 
             logger.info("Stage 5: Review & Feedback")
@@ -189,9 +209,9 @@ class DataPipeline:
         anomaly_penalty = (anomaly_count / total_rows * 100) if total_rows > 0 else 0
         quality_score = max(0, validation_score - anomaly_penalty)
 
-        null_counts = dataframe.isnull().sum()
-        total_cells = total_rows * len(dataframe.columns)
-        completeness = ((total_cells - null_counts.sum()) / total_cells * 100) if total_cells > 0 else 0
+        total_cells = dataframe.size
+        null_total = sum(self._null_count(column) for _, column in dataframe.items())
+        completeness = ((total_cells - null_total) / total_cells * 100) if total_cells > 0 else 0
 
         return {
             "quality_score": round(quality_score, 2),
@@ -203,22 +223,31 @@ class DataPipeline:
             "improvement_percentage": round(cleaning_result["metrics"]["modification_rate"], 2)
         }
 
+    @staticmethod
+    def _null_count(column: pd.Series) -> int:
+        dtype = column.dtype
+        if isinstance(dtype, pd.ArrowDtype) or (isinstance(dtype, pd.StringDtype) and dtype.storage == "pyarrow"):
+            return column.array.__arrow_array__().null_count
+        return int(column.isna().sum())
+
     def get_pipeline_config(self) -> Dict[str, Any]:
-        return {
-            "pipeline_id": self.pipeline_id,
-            "pipeline_name": "Banking Data Cleaning Pipeline",
-            "nodes": [
-                self.nodes["ingestion"].get_node_config(),
-                self.nodes["validation"].get_node_config(),
-                self.nodes["cleaning"].get_node_config(),
-                self.nodes["anomaly_detection"].get_node_config()
-            ],
-            "execution_order": [
-                "ingestion",
-                "validation",
-                "cleaning",
-                "anomaly_detection",
-                "review",
-                "publishing"
-            ]
-        }
+        return {"pipeline_id": self.pipeline_id, **_PIPELINE_CONFIG}
+
+
+_PIPELINE_CONFIG = {
+    "pipeline_name": "Banking Data Cleaning Pipeline",
+    "nodes": [
+        _NODES["ingestion"].get_node_config(),
+        _NODES["validation"].get_node_config(),
+        _NODES["cleaning"].get_node_config(),
+        _NODES["anomaly_detection"].get_node_config()
+    ],
+    "execution_order": [
+        "ingestion",
+        "validation",
+        "cleaning",
+        "anomaly_detection",
+        "review",
+        "publishing"
+    ]
+}
@@ -0,0 +1,79 @@
+"""SQLite-backed cache for LLM responses that survives process restarts."""
+from typing import Optional, Dict, Any, List
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentResponseCache:
+
+    def __init__(self, path: str, ttl_seconds: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        # Calls arrive from worker threads; one connection, one transaction at a time.
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not keys:
+            return {}
+
+        placeholders = ",".join("?" * len(keys))
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM responses WHERE key IN ({placeholders}) AND expires_at > ?",
+                    (*keys, time.time())
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return {}
+
+        return {key: orjson.loads(value) for key, value in rows}
+
+    def set(self, key: str, value: Dict[str, Any]):
+        self.set_many({key: value})
+
+    def set_many(self, values: Dict[str, Dict[str, Any]]):
+        if not values:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        rows = [
+            (key, orjson.dumps(value, default=str, option=orjson.OPT_SERIALIZE_NUMPY), expires_at)
+            for key, value in values.items()
+        ]
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                        rows
+                    )
+                except sqlite3.Error:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
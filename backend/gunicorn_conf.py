@@ -0,0 +1,43 @@
+"""Gunicorn configuration for running the API under UvicornWorker processes."""
+import os
+import shutil
+import sys
+
+# Pipeline state is per-process unless REDIS_URL points the workers at a shared store.
+_default_workers = (os.cpu_count() or 1) * 2 + 1 if os.getenv("REDIS_URL") else 1
+
+workers = int(os.getenv("WEB_CONCURRENCY", _default_workers))
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_tmp_dir = "/dev/shm"
+reuse_port = True
+# Each worker imports the app, and so builds its DB engine and HTTP clients, after fork.
+preload_app = False
+
+# Workers record Prometheus metrics into files here so /metrics aggregates the whole pool.
+# Set before the workers import prometheus_client.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/dev/shm/prometheus_multiproc")
+
+
+def on_starting(server):
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    if hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[worker.age % len(cpus)]})
+
+    # Only reached if preload_app is turned on: the engine was then built in the master, so drop
+    # its inherited pool and let each worker open its own connections.
+    db = sys.modules.get("app.db")
+    if db is not None:
+        db.engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep upload/processed dirs and the LLM response cache out of the working tree.
+_scratch = tempfile.mkdtemp(prefix="watsonx-tests-")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_scratch, "uploads"))
+os.environ.setdefault("PROCESSED_DIR", os.path.join(_scratch, "processed"))
+os.environ.setdefault("WATSONX_CACHE_PATH", os.path.join(_scratch, "cache", "watsonx_responses.sqlite3"))
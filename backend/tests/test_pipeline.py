@@ -0,0 +1,71 @@
+"""Pipeline orchestration tests."""
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+
+from app.watsonx.pipeline import DataPipeline, _NODES
+
+SAMPLE_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "sample_data",
+    "transactions_sample.csv"
+)
+
+
+@pytest.fixture
+def dirty_csv(tmp_path):
+    df = pd.read_csv(SAMPLE_CSV, dtype={"amount": object})
+    df.loc[0, "status"] = " Success "
+    df.loc[1, "amount"] = "$1,250.00"
+    df.loc[2, "transaction_type"] = "XFER"
+    df.loc[3, "description"] = "  Grocery   store\tpurchase  "
+    df.loc[4, "transaction_id"] = " txn-0005 "
+    df.loc[5, "currency"] = None
+    df.loc[6, "customer_id"] = None
+    df.loc[7, "transaction_id"] = df.loc[8, "transaction_id"]
+    path = tmp_path / "dirty.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+async def _run_sequential(path):
+    ingested = await _NODES["ingestion"].execute(source_type="csv", source_path=path)
+    validated = await _NODES["validation"].execute(dataframe=ingested["dataframe"])
+    cleaned = await _NODES["cleaning"].execute(dataframe=validated["dataframe"])
+    detected = await _NODES["anomaly_detection"].execute(dataframe=cleaned["dataframe"])
+    metrics = {
+        "validation": validated["metrics"],
+        "cleaning": cleaned["metrics"],
+        "anomaly_detection": detected["metrics"]
+    }
+    return detected["dataframe"], metrics
+
+
+@pytest.mark.filterwarnings("error::pandas.errors.PerformanceWarning")
+@pytest.mark.parametrize("source", ["sample", "dirty"])
+def test_concurrent_stages_match_sequential_run(source, dirty_csv):
+    path = SAMPLE_CSV if source == "sample" else dirty_csv
+
+    result = asyncio.run(DataPipeline().execute_full_pipeline("csv", source_path=path))
+    expected_frame, expected_metrics = asyncio.run(_run_sequential(path))
+
+    assert result["status"] == "completed", result["errors"]
+    for stage, metrics in expected_metrics.items():
+        assert result["stages"][stage]["metrics"] == metrics, stage
+    pd.testing.assert_frame_equal(result["stages"]["publishing"]["dataframe"], expected_frame)
+
+
+def test_missing_required_column_fails_validation(tmp_path):
+    path = tmp_path / "no_transaction_id.csv"
+    pd.read_csv(SAMPLE_CSV).drop(columns=["transaction_id"]).to_csv(path, index=False)
+
+    result = asyncio.run(DataPipeline().execute_full_pipeline("csv", source_path=str(path)))
+
+    assert result["status"] == "failed"
+    assert result["errors"] == [{
+        "stage": "validation",
+        "error": "Missing required columns: ['transaction_id']"
+    }]
+    assert "cleaning" not in result["stages"]
@@ -6,25 +6,11 @@ CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 DROP TABLE IF EXISTS anomalies CASCADE;
 DROP TABLE IF EXISTS dataset_metadata CASCADE;
 DROP TABLE IF EXISTS pipeline_runs CASCADE;
+DROP TABLE IF EXISTS transaction_details CASCADE;
 DROP TABLE IF EXISTS transactions CASCADE;
 DROP TABLE IF EXISTS datasets CASCADE;
 
-CREATE TYPE dataset_status AS ENUM ('uploaded', 'validating', 'cleaning', 'analyzing', 'completed', 'failed');
-CREATE TYPE pipeline_stage AS ENUM ('ingestion', 'validation', 'cleaning', 'anomaly_detection', 'review', 'publishing');
-CREATE TYPE pipeline_status AS ENUM ('pending', 'running', 'completed', 'failed', 'cancelled');
-CREATE TYPE anomaly_type AS ENUM (
-    'negative_balance',
-    'duplicate_transaction',
-    'invalid_date',
-    'suspicious_amount',
-    'status_mismatch',
-    'missing_required_field',
-    'invalid_format',
-    'outlier',
-    'semantic_inconsistency',
-    'other'
-);
-CREATE TYPE anomaly_severity AS ENUM ('low', 'medium', 'high', 'critical');
+-- Status/stage/type/severity columns are SMALLINT codes; see the IntEnums in backend/app/models.
 
 
 CREATE TABLE datasets (
@@ -32,7 +18,7 @@ CREATE TABLE datasets (
     name VARCHAR(255) NOT NULL,
     source_type VARCHAR(50) NOT NULL,
     file_path VARCHAR(500),
-    status dataset_status DEFAULT 'uploaded' NOT NULL,
+    status SMALLINT DEFAULT 1 NOT NULL,
 
 
     total_rows INTEGER DEFAULT 0,
@@ -40,7 +26,7 @@ CREATE TABLE datasets (
     invalid_rows INTEGER DEFAULT 0,
     cleaned_rows INTEGER DEFAULT 0,
     anomaly_count INTEGER DEFAULT 0,
-    quality_score NUMERIC(5, 2) DEFAULT 0.0,
+    quality_score SMALLINT DEFAULT 0,
 
    
     processing_time_seconds NUMERIC(10, 2),
@@ -60,36 +46,48 @@ CREATE TABLE transactions (
     
     transaction_id VARCHAR(100) UNIQUE NOT NULL,
     customer_id VARCHAR(100) NOT NULL,
-    account_number VARCHAR(50),
 
  
-    amount NUMERIC(15, 2) NOT NULL,
-    balance NUMERIC(15, 2),
+    amount BIGINT NOT NULL,
+    balance BIGINT,
     currency VARCHAR(3) DEFAULT 'USD' NOT NULL,
 
    
     transaction_date TIMESTAMP NOT NULL,
     transaction_type VARCHAR(50),
     status VARCHAR(50) NOT NULL,
-    description TEXT,
-    merchant VARCHAR(255),
-    category VARCHAR(100),
 
  
     is_valid BOOLEAN DEFAULT TRUE NOT NULL,
     is_anomaly BOOLEAN DEFAULT FALSE NOT NULL,
     was_cleaned BOOLEAN DEFAULT FALSE NOT NULL,
 
+  
+    country_code VARCHAR(2),
+
    
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+) WITH (fillfactor = 90);
+
+
+CREATE TABLE transaction_details (
+    id SERIAL PRIMARY KEY,
+    transaction_id VARCHAR(100) UNIQUE NOT NULL REFERENCES transactions(transaction_id) ON DELETE CASCADE,
+
+
+    account_number VARCHAR(50),
+    description TEXT,
+    merchant VARCHAR(255),
+    category VARCHAR(100),
+    location VARCHAR(255),
+
+
     original_values JSONB,
     cleaning_actions JSONB,
     validation_errors JSONB,
 
-  
-    location VARCHAR(255),
-    country_code VARCHAR(2),
 
-   
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
@@ -101,13 +99,13 @@ CREATE TABLE pipeline_runs (
 
     
     run_id VARCHAR(100) UNIQUE NOT NULL,
-    stage pipeline_stage NOT NULL,
-    status pipeline_status DEFAULT 'pending' NOT NULL,
+    stage SMALLINT NOT NULL,
+    status SMALLINT DEFAULT 1 NOT NULL,
 
     
     started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
     completed_at TIMESTAMP,
-    duration_seconds NUMERIC(10, 2),
+    duration_seconds NUMERIC(10, 2) GENERATED ALWAYS AS (EXTRACT(EPOCH FROM (completed_at - started_at))) STORED,
 
 
     input_rows INTEGER DEFAULT 0,
@@ -136,8 +134,8 @@ CREATE TABLE anomalies (
     transaction_id VARCHAR(100),
 
 
-    anomaly_type anomaly_type NOT NULL,
-    severity anomaly_severity DEFAULT 'medium' NOT NULL,
+    anomaly_type SMALLINT NOT NULL,
+    severity SMALLINT DEFAULT 2 NOT NULL,
 
 
     confidence_score NUMERIC(5, 4) NOT NULL,
@@ -151,7 +149,7 @@ CREATE TABLE anomalies (
     context JSONB,
 
 
-    is_resolved INTEGER DEFAULT 0 NOT NULL,
+    is_resolved BOOLEAN DEFAULT FALSE NOT NULL,
     resolution_action VARCHAR(50),
     resolved_value TEXT,
 
@@ -174,10 +172,10 @@ CREATE TABLE dataset_metadata (
     column_count INTEGER DEFAULT 0,
 
     
-    completeness_score NUMERIC(5, 2) DEFAULT 0.0,
-    validity_score NUMERIC(5, 2) DEFAULT 0.0,
-    consistency_score NUMERIC(5, 2) DEFAULT 0.0,
-    accuracy_score NUMERIC(5, 2) DEFAULT 0.0,
+    completeness_score SMALLINT DEFAULT 0,
+    validity_score SMALLINT DEFAULT 0,
+    consistency_score SMALLINT DEFAULT 0,
+    accuracy_score SMALLINT DEFAULT 0,
 
     
     null_counts JSONB,
@@ -214,21 +212,23 @@ CREATE TABLE dataset_metadata (
 
 CREATE INDEX idx_datasets_status ON datasets(status);
 CREATE INDEX idx_datasets_created_at ON datasets(created_at DESC);
-CREATE INDEX idx_transactions_dataset_id ON transactions(dataset_id);
+CREATE INDEX ix_txn_dataset_date ON transactions(dataset_id, transaction_date);
+CREATE INDEX ix_txn_anomalies ON transactions(dataset_id) WHERE is_anomaly;
 CREATE INDEX idx_transactions_transaction_id ON transactions(transaction_id);
 CREATE INDEX idx_transactions_customer_id ON transactions(customer_id);
 CREATE INDEX idx_transactions_date ON transactions(transaction_date);
 CREATE INDEX idx_transactions_anomaly ON transactions(is_anomaly) WHERE is_anomaly = TRUE;
-CREATE INDEX idx_pipeline_runs_dataset_id ON pipeline_runs(dataset_id);
+CREATE INDEX ix_run_dataset_started ON pipeline_runs(dataset_id, started_at);
 CREATE INDEX idx_pipeline_runs_run_id ON pipeline_runs(run_id);
 CREATE INDEX idx_pipeline_runs_status ON pipeline_runs(status);
-CREATE INDEX idx_anomalies_dataset_id ON anomalies(dataset_id);
+CREATE INDEX ix_anomaly_dataset_type_severity ON anomalies(dataset_id, anomaly_type, severity);
+CREATE INDEX ix_anomaly_unresolved ON anomalies(dataset_id) WHERE NOT is_resolved;
 CREATE INDEX idx_anomalies_severity ON anomalies(severity);
 CREATE INDEX idx_anomalies_type ON anomalies(anomaly_type);
 CREATE INDEX idx_dataset_metadata_dataset_id ON dataset_metadata(dataset_id);
 
 
-CREATE INDEX idx_transactions_description_gin ON transactions USING gin(to_tsvector('english', description));
+CREATE INDEX idx_transaction_details_description_gin ON transaction_details USING gin(to_tsvector('english', description));
 
 
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -250,6 +250,11 @@ CREATE TRIGGER update_transactions_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_transaction_details_updated_at
+    BEFORE UPDATE ON transaction_details
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_pipeline_runs_updated_at
     BEFORE UPDATE ON pipeline_runs
     FOR EACH ROW
@@ -267,10 +272,11 @@ CREATE TRIGGER update_dataset_metadata_updated_at
 
 
 INSERT INTO datasets (name, source_type, status, total_rows)
-VALUES ('Sample Banking Dataset', 'csv', 'uploaded', 0);
+VALUES ('Sample Banking Dataset', 'csv', 1, 0);
 
 COMMENT ON TABLE datasets IS 'Stores information about uploaded datasets';
 COMMENT ON TABLE transactions IS 'Stores individual banking transaction records';
+COMMENT ON TABLE transaction_details IS 'Stores wide text and JSON fields of transactions';
 COMMENT ON TABLE pipeline_runs IS 'Tracks execution of pipeline stages';
 COMMENT ON TABLE anomalies IS 'Records detected anomalies in datasets';
 COMMENT ON TABLE dataset_metadata IS 'Stores statistical metadata about datasets';